@@ -508,14 +508,14 @@ def stats(dataset_path: str, missing: Optional[str]):
             
             for track_path, track in index.tracks.items():
                 # Count regular components
-                for comp_name, file_path in track.files.items():
+                for comp_name, _, size in track.iter_files():
                     component_counts[comp_name] += 1
-                    component_sizes[comp_name] += track.file_sizes[file_path]
+                    component_sizes[comp_name] += size
                 
                 # Check for missing component if requested
-                if missing and missing not in track.files:
+                if missing and missing not in track.component_names:
                     # Count other components present in tracks missing the specified one
-                    for comp_name in track.files:
+                    for comp_name in track.component_names:
                         missing_stats[comp_name] += 1
                     # Track artists and albums with missing files
                     missing_artists.add(track.artist)
@@ -589,14 +589,14 @@ def stats(dataset_path: str, missing: Optional[str]):
             
             for track_path, track in index.tracks.items():
                 # Count regular components
-                for comp_name, file_path in track.files.items():
+                for comp_name, _, size in track.iter_files():
                     component_counts[comp_name] += 1
-                    component_sizes[comp_name] += track.file_sizes[file_path]
+                    component_sizes[comp_name] += size
                 
                 # Check for missing component if requested
-                if missing and missing not in track.files:
+                if missing and missing not in track.component_names:
                     # Count other components present in tracks missing the specified one
-                    for comp_name in track.files:
+                    for comp_name in track.component_names:
                         missing_stats[comp_name] += 1
                     # Track artists and albums with missing files
                     missing_artists.add(track.artist)
@@ -835,9 +835,9 @@ def reindex(dataset_path: str):
         component_counts = defaultdict(int)
         component_sizes = defaultdict(int)
         for track in dataset._index.tracks.values():
-            for comp_name, file_path in track.files.items():
+            for comp_name, _, size in track.iter_files():
                 component_counts[comp_name] += 1
-                component_sizes[comp_name] += track.file_sizes[file_path]
+                component_sizes[comp_name] += size
         
         # Show statistics
         click.echo("\nIndex rebuilt successfully!")
@@ -1047,7 +1047,9 @@ def remove_location(dataset_path: str, name: str):
 @click.argument('target_loc')
 @click.option('--size', type=float, required=True, help='Approximate size in GB to move.')
 @click.option('--dry-run', is_flag=True, help='Simulate the move without moving files.')
-def balance_location(dataset_path: str, source_loc: str, target_loc: str, size: float, dry_run: bool):
+@click.option('--parallel', type=int, default=1, help='Number of files to move in parallel (1 for sequential)')
+def balance_location(dataset_path: str, source_loc: str, target_loc: str, size: float, dry_run: bool,
+                     parallel: int):
     """Balance storage by moving data between locations to reach a target size."""
     try:
         dataset_path_obj = Path(dataset_path)
@@ -1072,6 +1074,7 @@ def balance_location(dataset_path: str, source_loc: str, target_loc: str, size:
             target_location_name=target_loc,
             size_limit_gb=size,
             dry_run=dry_run,
+            parallel=parallel,
         )
 
         if dry_run:
@@ -1105,7 +1108,9 @@ def balance_location(dataset_path: str, source_loc: str, target_loc: str, size:
 @click.argument('folders_str')
 @click.option('--source-location', required=True, help='Name of the source location to move folders from.')
 @click.option('--dry-run', is_flag=True, help='Simulate the move without moving files.')
-def move_location_folders(dataset_path: str, target_loc: str, folders_str: str, source_location: str, dry_run: bool):
+@click.option('--parallel', type=int, default=1, help='Number of files to move in parallel (1 for sequential)')
+def move_location_folders(dataset_path: str, target_loc: str, folders_str: str, source_location: str, dry_run: bool,
+                          parallel: int):
     """Move specific folders (relative to source location root) to another location."""
     try:
         # Split the folders string into a list
@@ -1137,6 +1142,7 @@ def move_location_folders(dataset_path: str, target_loc: str, folders_str: str,
             target_location_name=target_loc,
             specific_folders=folders, # Pass the processed list
             dry_run=dry_run,
+            parallel=parallel,
         )
 
         if dry_run:
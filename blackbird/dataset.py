@@ -7,7 +7,7 @@ import os
 from collections import defaultdict
 from tqdm import tqdm
 from .locations import LocationsManager
-from .locations import resolve_symbolic_path, SymbolicPathError
+from .locations import resolve_symbolic_path, make_resolver, SymbolicPathError
 
 logger = logging.getLogger(__name__)
 
@@ -72,13 +72,10 @@ class Dataset:
         component_sizes = defaultdict(int)
         total_files = 0
         for track_path_symbolic, track_info in index.tracks.items():
-            total_files += len(track_info.files)
-            for comp_name, file_path_symbolic in track_info.files.items():
+            total_files += len(track_info.component_names)
+            for comp_name, _, size in track_info.iter_files():
                 component_counts[comp_name] += 1
-                if file_path_symbolic in track_info.file_sizes:
-                    component_sizes[comp_name] += track_info.file_sizes[file_path_symbolic]
-                else:
-                    logger.warning(f"Size missing for symbolic path '{file_path_symbolic}' in track '{track_path_symbolic}'. Stats might be inaccurate.")
+                component_sizes[comp_name] += size
 
         logger.info("\nIndex rebuilt successfully!")
         logger.info(f"\nNew index statistics (across all locations):")
@@ -117,7 +114,7 @@ class Dataset:
             ValueError: If the input is invalid.
         """
         # Ensure locations are loaded
-        current_locations = self.locations.get_all_locations()
+        current_locations = self.locations.get_all_location_strings()
         if not current_locations:
              # This might indicate an issue, but resolve_symbolic_path handles empty dict
              logger.warning("Attempting to resolve path with no locations loaded.")
@@ -157,17 +154,20 @@ class Dataset:
         tracks_to_check = self._index.search_by_track("", artist=artist, album=album)
         
         logger.debug(f"Index search returned {len(tracks_to_check)} potential tracks.")
+
+        # Locations don't change during the search, resolve against a specialized resolver
+        resolver = make_resolver(self.locations.get_all_location_strings())
         
         for track_info in tracks_to_check:
-            track_components = set(track_info.files.keys())
+            track_components = set(track_info.component_names)
             
             if all(c in track_components for c in has) and \
                all(c not in track_components for c in missing):
                 
                 resolved_file_paths: List[Path] = []
-                for symbolic_file_path in track_info.files.values():
+                for symbolic_file_path in track_info.file_paths:
                     try:
-                        resolved_path = self.resolve_path(symbolic_file_path)
+                        resolved_path = Path(resolver(symbolic_file_path))
                         resolved_file_paths.append(resolved_path)
                     except Exception as e:
                         logger.error(f"Error resolving path '{symbolic_file_path}' for track '{track_info.track_path}': {e}")
@@ -209,14 +209,11 @@ class Dataset:
         all_schema_components = set(self._schema.schema.get("components", {}).keys())
         
         for track_path_symbolic, track_info in self._index.tracks.items():
-            track_components = set(track_info.files.keys())
+            track_components = set(track_info.component_names)
             
-            for comp_name, file_path_symbolic in track_info.files.items():
+            for comp_name, _, size in track_info.iter_files():
                 stats["components"][comp_name]['count'] += 1
-                if file_path_symbolic in track_info.file_sizes:
-                    stats["components"][comp_name]['size'] += track_info.file_sizes[file_path_symbolic]
-                else:
-                    logger.warning(f"Size missing for symbolic path '{file_path_symbolic}' in track '{track_path_symbolic}' during analysis.")
+                stats["components"][comp_name]['size'] += size
 
             stats["tracks"]["by_artist"][track_info.artist] += 1
             
@@ -249,9 +246,15 @@ class Dataset:
             self._index = self._load_or_build_index()
         return self._index
 
-    def build_index(self, progress_callback=None):
-        """Build or rebuild the dataset index."""
-        self._index = DatasetIndex.build(self.path, self.schema, progress_callback)
+    def build_index(self, progress_callback=None, collect_sizes: bool = True):
+        """Build or rebuild the dataset index.
+
+        Args:
+            progress_callback: Optional callable receiving build progress
+            collect_sizes: Record file sizes; see ``DatasetIndex.build``
+        """
+        self._index = DatasetIndex.build(self.path, self.schema, progress_callback,
+                                         collect_sizes=collect_sizes)
         self._index.save(self.path / ".blackbird" / "index.pickle")
         return self._index
 
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, Set, List, Optional, TYPE_CHECKING, Tuple
+from typing import Dict, Iterator, MutableMapping, Set, List, Optional, TYPE_CHECKING, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import pickle
@@ -7,6 +7,7 @@ import logging
 from collections import defaultdict
 import time
 import os
+import sys
 from tqdm import tqdm
 import re
 from difflib import get_close_matches
@@ -18,16 +19,230 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
-@dataclass
 class TrackInfo:
-    """Track information in the index."""
-    track_path: str      # Relative path identifying the track (artist/album/[cd]/track)
-    artist: str         # Artist name
-    album_path: str     # Full path to album (artist/album)
-    cd_number: Optional[str]  # CD number if present
-    base_name: str      # Track name without component suffixes
-    files: Dict[str, str]  # component_name -> file_path mapping
-    file_sizes: Dict[str, int]  # file_path -> size in bytes
+    """Track information in the index.
+
+    Component files are stored as parallel tuples (``component_names``,
+    ``file_paths``, ``sizes``) rather than two dicts per track, which keeps
+    large indexes compact. ``files`` and ``file_sizes`` are live mappings over
+    those tuples, and edits to them are written back to the track. Loops over a
+    track's files should use ``iter_files()``, which builds each full path once
+    instead of one per lookup.
+
+    Symbolic paths all start with the same ``"<location>/"`` prefix, so the
+    location name is stored once (interned, shared by every track in that
+    location) and ``track_path``, ``album_path`` and the file paths are kept
+    relative to it. The full symbolic paths are rebuilt on access.
+    """
+    __slots__ = ('location', 'rel_track_path', 'artist', 'rel_album_path', 'cd_number',
+                 'base_name', 'component_names', 'rel_file_paths', 'sizes')
+
+    def __init__(self, track_path: str, artist: str, album_path: str, cd_number: Optional[str],
+                 base_name: str, files: Dict[str, str], file_sizes: Dict[str, int]):
+        self.artist = artist          # Artist name
+        self.cd_number = cd_number    # CD number if present
+        self.base_name = base_name    # Track name without component suffixes
+        # Component names have very low cardinality, share one string object per name
+        self.component_names = tuple(sys.intern(name) for name in files)
+        # Symbolic track path (Location/Artist/Album/[CD]/track), album path (Location/Artist/Album)
+        # and component file paths
+        self._set_paths(track_path, album_path, tuple(files.values()))
+        self.file_sizes = file_sizes  # file_path -> size in bytes
+
+    def _set_paths(self, track_path: str, album_path: str, file_paths: Tuple[str, ...]) -> None:
+        """Store the symbolic paths relative to the track's location.
+
+        Paths that don't share the track's location prefix (e.g. hand-built
+        entries) are kept verbatim with ``location`` set to None.
+        """
+        location, sep, rel_track_path = track_path.partition('/')
+        prefix = location + '/'
+        if sep and album_path.startswith(prefix) and all(p.startswith(prefix) for p in file_paths):
+            prefix_len = len(prefix)
+            self.location = sys.intern(location)
+            self.rel_track_path = rel_track_path
+            self.rel_album_path = album_path[prefix_len:]
+            self.rel_file_paths = tuple(p[prefix_len:] for p in file_paths)
+        else:
+            self.location = None
+            self.rel_track_path = track_path
+            self.rel_album_path = album_path
+            self.rel_file_paths = tuple(file_paths)
+
+    def _full_path(self, rel_path: str) -> str:
+        location = self.location
+        return rel_path if location is None else f"{location}/{rel_path}"
+
+    @property
+    def track_path(self) -> str:
+        """Symbolic path identifying the track (Location/Artist/Album/[CD]/track)."""
+        return self._full_path(self.rel_track_path)
+
+    @track_path.setter
+    def track_path(self, track_path: str) -> None:
+        self._set_paths(track_path, self.album_path, self.file_paths)
+
+    @property
+    def album_path(self) -> str:
+        """Symbolic path of the album (Location/Artist/Album)."""
+        return self._full_path(self.rel_album_path)
+
+    @album_path.setter
+    def album_path(self, album_path: str) -> None:
+        self._set_paths(self.track_path, album_path, self.file_paths)
+
+    @property
+    def file_paths(self) -> Tuple[str, ...]:
+        """Symbolic file paths, parallel to ``component_names``.
+
+        The full paths are rebuilt from the location on every access, so
+        read this once per loop (or use ``iter_files()``) rather than per
+        lookup; membership checks on components only need ``component_names``.
+        """
+        location = self.location
+        if location is None:
+            return self.rel_file_paths
+        return tuple(f"{location}/{p}" for p in self.rel_file_paths)
+
+    def iter_files(self) -> Iterator[Tuple[str, str, int]]:
+        """Yield ``(component_name, file_path, size)`` for each component file."""
+        return zip(self.component_names, self.file_paths, self.sizes)
+
+    @property
+    def files(self) -> MutableMapping[str, str]:
+        """Mapping of component name to file path."""
+        return _TrackFiles(self)
+
+    @files.setter
+    def files(self, files: Dict[str, str]) -> None:
+        files = dict(files)
+        previous_sizes = dict(zip(self.file_paths, self.sizes))
+        self.component_names = tuple(sys.intern(name) for name in files)
+        self._set_paths(self.track_path, self.album_path, tuple(files.values()))
+        self.file_sizes = previous_sizes
+
+    @property
+    def file_sizes(self) -> MutableMapping[str, int]:
+        """Mapping of file path to size in bytes, one entry per component file."""
+        return _TrackFileSizes(self)
+
+    @file_sizes.setter
+    def file_sizes(self, file_sizes: Dict[str, int]) -> None:
+        self.sizes = tuple(file_sizes.get(path, 0) for path in self.file_paths)
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Pickled with the original field layout, so clients that predate the
+        # compact storage can still load indexes written by this version
+        return {
+            'track_path': self.track_path,
+            'artist': self.artist,
+            'album_path': self.album_path,
+            'cd_number': self.cd_number,
+            'base_name': self.base_name,
+            'files': dict(zip(self.component_names, self.file_paths)),
+            'file_sizes': dict(zip(self.file_paths, self.sizes)),
+        }
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        if 'rel_track_path' in state:
+            for name, value in state.items():
+                setattr(self, name, value)
+            if self.location is not None:
+                self.location = sys.intern(self.location)
+            return
+        # Full symbolic paths, either as 'files'/'file_sizes' dicts or as
+        # 'file_paths'/'sizes' tuples
+        files = state.get('files')
+        if files is None:
+            files = dict(zip(state['component_names'], state['file_paths']))
+        file_sizes = state.get('file_sizes')
+        if file_sizes is None:
+            file_sizes = dict(zip(state['file_paths'], state['sizes']))
+        self.__init__(state['track_path'], state['artist'], state['album_path'], state['cd_number'],
+                      state['base_name'], files, file_sizes)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+
+    def __repr__(self) -> str:
+        return (f"TrackInfo(track_path={self.track_path!r}, artist={self.artist!r}, "
+                f"album_path={self.album_path!r}, cd_number={self.cd_number!r}, "
+                f"base_name={self.base_name!r}, files={dict(self.files)!r}, "
+                f"file_sizes={dict(self.file_sizes)!r})")
+
+class _TrackFiles(MutableMapping[str, str]):
+    """Live ``component_name -> file_path`` mapping of a TrackInfo."""
+    __slots__ = ('_track',)
+
+    def __init__(self, track: TrackInfo):
+        self._track = track
+
+    def __getitem__(self, component: str) -> str:
+        track = self._track
+        try:
+            position = track.component_names.index(component)
+        except ValueError:
+            raise KeyError(component) from None
+        return track._full_path(track.rel_file_paths[position])
+
+    def __setitem__(self, component: str, file_path: str) -> None:
+        files = dict(zip(self._track.component_names, self._track.file_paths))
+        files[component] = file_path
+        self._track.files = files
+
+    def __delitem__(self, component: str) -> None:
+        files = dict(zip(self._track.component_names, self._track.file_paths))
+        del files[component]
+        self._track.files = files
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._track.component_names)
+
+    def __len__(self) -> int:
+        return len(self._track.component_names)
+
+    def __repr__(self) -> str:
+        return repr(dict(zip(self._track.component_names, self._track.file_paths)))
+
+class _TrackFileSizes(MutableMapping[str, int]):
+    """Live ``file_path -> size`` mapping of a TrackInfo.
+
+    Its keys are the track's file paths, so sizes can be changed but not
+    added or removed; change ``files`` for that.
+    """
+    __slots__ = ('_track',)
+
+    def __init__(self, track: TrackInfo):
+        self._track = track
+
+    def _position(self, file_path: str) -> int:
+        try:
+            return self._track.file_paths.index(file_path)
+        except ValueError:
+            raise KeyError(file_path) from None
+
+    def __getitem__(self, file_path: str) -> int:
+        return self._track.sizes[self._position(file_path)]
+
+    def __setitem__(self, file_path: str, size: int) -> None:
+        position = self._position(file_path)
+        sizes = list(self._track.sizes)
+        sizes[position] = size
+        self._track.sizes = tuple(sizes)
+
+    def __delitem__(self, file_path: str) -> None:
+        raise TypeError(f"Can't delete the size of {file_path!r}; remove the file from files instead")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._track.file_paths)
+
+    def __len__(self) -> int:
+        return len(self._track.sizes)
+
+    def __repr__(self) -> str:
+        return repr(dict(zip(self._track.file_paths, self._track.sizes)))
 
 @dataclass
 class DatasetIndex:
@@ -40,7 +255,8 @@ class DatasetIndex:
     total_files: int = 0  # Total number of indexed files
     stats_by_location: Dict[str, Dict] = field(default_factory=dict)  # location_name -> {file_count, total_size, track_count, album_count, artist_count}
     file_info_by_hash: Dict[int, Tuple[str, int]] = field(default_factory=dict) # hash(symbolic_file_path) -> (symbolic_file_path, size)
-    version: str = "1.0"  # Move version with default value to the end
+    sizes_collected: bool = True  # False when built with collect_sizes=False, all sizes are then 0
+    version: str = "1.1"  # Move version with default value to the end
 
     @classmethod
     def create(cls) -> 'DatasetIndex':
@@ -94,7 +310,8 @@ class DatasetIndex:
         
         # If no matches found and fuzzy search is enabled, try fuzzy matching
         if not matches and fuzzy_search:
-            artists = list(self.album_by_artist.keys())
+            # Only artists whose name length can reach the cutoff are compared
+            artists = self._fuzzy_artist_candidates(query, case_sensitive, cutoff=0.6)
             
             if not case_sensitive:
                 # For case-insensitive search, convert query to lowercase
@@ -111,6 +328,22 @@ class DatasetIndex:
         
         return matches
 
+    def _fuzzy_artist_candidates(self, query: str, case_sensitive: bool, cutoff: float) -> List[str]:
+        """Artists whose name length allows a difflib ratio of at least ``cutoff``.
+
+        A ratio is ``2*M/(len(a)+len(b))`` with ``M <= min(len(a), len(b))``, so
+        names of very different length can never match. Taking the lengths is far
+        cheaper than a difflib comparison, so they are computed on every call.
+        """
+        query_len = len(query)
+        candidates = []
+        for artist in self.album_by_artist:
+            length = len(artist if case_sensitive else artist.lower())
+            total = query_len + length
+            if total and 2.0 * min(query_len, length) / total >= cutoff:
+                candidates.append(artist)
+        return candidates
+
     def search_by_album(self, album_query: str, artist: Optional[str] = None) -> List[str]:
         """Search for albums by name.
 
@@ -173,16 +406,28 @@ class DatasetIndex:
         Returns a dictionary mapping component names to file paths."""
         if track_path not in self.tracks:
             return {}
-        return self.tracks[track_path].files
+        return dict(self.tracks[track_path].files)
 
     def get_file_info_by_hash(self, hash_val: int) -> Optional[Tuple[str, int]]:
         """Retrieve file info (symbolic path, size) by its symbolic path hash."""
         return self.file_info_by_hash.get(hash_val)
 
     @classmethod
-    def build(cls, dataset_path: Path, schema: 'DatasetComponentSchema', progress_callback=None) -> 'DatasetIndex':
-        """Build a new index for the dataset scanning across all configured locations."""
+    def build(cls, dataset_path: Path, schema: 'DatasetComponentSchema', progress_callback=None,
+              collect_sizes: bool = True) -> 'DatasetIndex':
+        """Build a new index for the dataset scanning across all configured locations.
+
+        Args:
+            dataset_path: Path to dataset root directory
+            schema: Schema providing the component patterns
+            progress_callback: Optional callable receiving build progress (0.0-1.0)
+            collect_sizes: Stat every matched file to record its size. When False no
+                stat calls are made; ``total_size``, ``file_sizes`` and all size stats
+                are 0 and ``sizes_collected`` is set to False, so size-limited moves
+                refuse to run on the index.
+        """
         index = cls.create()
+        index.sizes_collected = collect_sizes
         location_roots: Dict[str, Path] = {}
         try:
             locations_manager = LocationsManager(dataset_path)
@@ -205,8 +450,12 @@ class DatasetIndex:
 
         logger.info("Finding all files across locations...")
         found_count = 0
-        # List of tuples: (abs_path, location_name, comp_name, base_name, size)
-        matched_files_info = []
+        matched_count = 0
+        # Matched files are grouped into track instances as they are found.
+        # Key: (loc, artist, album, cd, base) -> Value: List of (comp_name, symbolic_file_path, size)
+        tracks_grouped = defaultdict(list)
+        component_counts = defaultdict(int)
+        component_sizes = defaultdict(int)
         unmatched_files = [] # Stores symbolic paths of unmatched files
         total_dirs = 0
         start_time = time.time()
@@ -217,7 +466,7 @@ class DatasetIndex:
         for comp_name, comp_info in schema.schema["components"].items():
             pattern = comp_info["pattern"]
             # Escape regex special chars and replace glob *
-            regex_safe_pattern = pattern.replace(".", "\.").replace("*", ".*")
+            regex_safe_pattern = pattern.replace(".", "\\.").replace("*", ".*")
             component_patterns[comp_name] = re.compile(regex_safe_pattern + "$")
             # Identify potential suffix to remove for base name calculation
             # Assumes suffix starts after the first '*' or from the beginning if no '*'
@@ -232,8 +481,14 @@ class DatasetIndex:
 
         # Sort patterns by length descending to remove longest match first
         patterns_to_remove.sort(key=len, reverse=True)
-
-        # First pass: Scan all locations and collect file info
+        # Compile the suffix-stripping regexes once instead of per matched file
+        suffix_regexes = []
+        for suffix in patterns_to_remove:
+            # Needs careful handling of glob * within suffix
+            escaped_suffix_regex = suffix.replace(".", "\\.").replace("*", ".*")
+            suffix_regexes.append(re.compile(f"^(.*?)({escaped_suffix_regex})$"))
+
+        # Count directories first so the scan can report progress
         logger.info("Counting directories across all locations...")
         effective_locations_count = 0
         for location_name, location_root in location_roots.items():
@@ -259,6 +514,11 @@ class DatasetIndex:
 
         logger.info(f"Found {total_dirs} total directories to scan across {effective_locations_count} accessible locations.")
 
+        # Bind hot-loop lookups to locals
+        _append_unmatched = unmatched_files.append
+        _warn = logger.warning
+        _comp_items = list(component_patterns.items())
+
         with tqdm(total=total_dirs, desc="Scanning directories", unit="dir") as pbar:
             for location_name, location_root in location_roots.items():
                 if not location_root.is_dir():
@@ -266,37 +526,68 @@ class DatasetIndex:
                     continue # Skip scanning this location
 
                 try:
-                    for root, dirs, files in os.walk(location_root, topdown=True):
+                    # Walk with os.scandir so each file's DirEntry (and its cached stat) is available
+                    # Each pending entry carries the directory's path parts relative to the location root
+                    pending_dirs = [(str(location_root), ())]
+                    while pending_dirs:
+                         current_dir, dir_parts = pending_dirs.pop()
                          pbar.update(1) # Update progress per directory visited
-                         current_root_path = Path(root)
-
-                         # Prevent recursing into .blackbird
-                         if '.blackbird' in dirs:
-                             dirs.remove('.blackbird')
-                         # Also skip processing if we somehow entered a .blackbird dir
-                         if '.blackbird' in current_root_path.relative_to(location_root).parts:
+                         try:
+                             with os.scandir(current_dir) as it:
+                                 entries = list(it)
+                         except OSError as e:
+                             logger.warning(f"Could not list directory {current_dir}: {e}. Skipping.")
                              continue
 
-                         for filename in files:
+                         # Parse Artist/Album/[CDx] once per directory rather than per file
+                         dir_layout = None
+                         layout_error = None
+                         if len(dir_parts) < 2 or len(dir_parts) > 3:
+                             layout_error = "Skipping file with unexpected directory structure"
+                         else:
+                             cd_number = None
+                             expected_parent_parts = 2 # Artist/Album
+                             # Check for standard CD structure: Artist/Album/CDX/...
+                             if len(dir_parts) == 3 and dir_parts[2].startswith('CD') and dir_parts[2][2:].isdigit():
+                                 cd_number = dir_parts[2]
+                                 expected_parent_parts = 3 # Artist/Album/CDX
+                             # Ensure the file is directly within the expected level (Artist/Album or Artist/Album/CDX)
+                             if len(dir_parts) != expected_parent_parts:
+                                 layout_error = "Skipping file with unexpected directory structure (not at expected depth)"
+                             else:
+                                 dir_layout = (dir_parts[0], dir_parts[1], cd_number)
+                         symbolic_dir = "/".join((location_name,) + dir_parts)
+
+                         subdirs = []
+                         for entry in entries:
+                             filename = entry.name
+                             try:
+                                 is_dir = entry.is_dir()
+                             except OSError:
+                                 is_dir = False
+                             if is_dir:
+                                 # Prevent recursing into .blackbird; like os.walk, don't follow symlinked dirs
+                                 if filename != '.blackbird' and not entry.is_symlink():
+                                     subdirs.append((entry.path, dir_parts + (filename,)))
+                                 continue
+
                              # Skip hidden files (e.g., .DS_Store) and temp files
                              if filename.startswith('.') or filename.endswith(('.tmp', '.bak')):
                                  continue
 
-                             abs_path = current_root_path / filename
+                             symbolic_file_path = f"{symbolic_dir}/{filename}"
                              found_count += 1
                              file_matched = False
 
                              try:
                                  # Check against component patterns
-                                 for comp_name, regex_pattern in component_patterns.items():
+                                 for comp_name, regex_pattern in _comp_items:
                                      if regex_pattern.search(filename):
                                          # Calculate base_name by removing the longest matching component suffix
                                          base_name = filename
-                                         for suffix in patterns_to_remove:
+                                         for suffix_regex in suffix_regexes:
                                              # Attempt to remove suffix pattern from the end
-                                             # Needs careful handling of glob * within suffix
-                                             escaped_suffix_regex = suffix.replace(".", "\.").replace("*", ".*")
-                                             match = re.search(f"^(.*?)({escaped_suffix_regex})$", base_name)
+                                             match = suffix_regex.search(base_name)
                                              if match:
                                                  potential_base = match.group(1)
                                                  # Check if removing suffix resulted in empty string or just '_'
@@ -310,110 +601,74 @@ class DatasetIndex:
                                          base_name = Path(base_name).stem
 
                                          if not base_name:
-                                             logger.warning(f"Could not determine base name for file: {filename} in {location_name}. Skipping.")
+                                             _warn(f"Could not determine base name for file: {filename} in {location_name}. Skipping.")
                                              continue
 
-                                         size = abs_path.stat().st_size
-                                         matched_files_info.append((abs_path, location_name, comp_name, base_name, size))
                                          file_matched = True
+                                         matched_count += 1
+                                         if dir_layout is None:
+                                             _warn(f"{layout_error}: {symbolic_file_path}")
+                                             break
+
+                                         size = entry.stat().st_size if collect_sizes else 0
+                                         artist, album, cd_number = dir_layout
+                                         # Define the unique key for this track instance in this location
+                                         track_key = (location_name, artist, album, cd_number, base_name)
+                                         tracks_grouped[track_key].append((comp_name, symbolic_file_path, size))
+
+                                         # Aggregate stats (will be stored per-location later if needed)
+                                         component_counts[comp_name] += 1
+                                         component_sizes[comp_name] += size
+                                         index.total_size += size # Aggregate total size for now
+
+                                         # Update per-location file count and size stats
+                                         location_file_counts[location_name] += 1
+                                         location_total_sizes[location_name] += size
                                          break # Stop after first component match for this file
 
                                  if not file_matched:
                                      # Store symbolic path for unmatched files
-                                     rel_path_unmatched = abs_path.relative_to(location_root)
-                                     symbolic_unmatched = f"{location_name}/{rel_path_unmatched}"
-                                     unmatched_files.append(symbolic_unmatched)
+                                     _append_unmatched(symbolic_file_path)
 
                              except FileNotFoundError:
-                                 logger.warning(f"File vanished during scan: {abs_path}. Skipping.")
+                                 _warn(f"File vanished during scan: {entry.path}. Skipping.")
                                  found_count -=1 # Adjust count
                              except OSError as e:
-                                 logger.error(f"OS error accessing file {abs_path}: {e}. Skipping.")
+                                 logger.error(f"OS error accessing file {entry.path}: {e}. Skipping.")
                                  found_count -= 1 # Adjust count
-                             except ValueError as e: # Catch potential relative_to errors
-                                logger.warning(f"Path calculation error for {abs_path} in {location_name}: {e}. Skipping unmatched.")
                              except Exception as e:
                                 logger.error(f"Unexpected error matching file {filename} in {location_name}: {e}")
 
+                         # Visit subdirectories in listing order
+                         pending_dirs.extend(reversed(subdirs))
+
                          # Update postfix less frequently for performance if needed
                          if pbar.n % 50 == 0: # Update every 50 dirs
-                              pbar.set_postfix({"loc": location_name[:10], "files": found_count, "matched": len(matched_files_info)}, refresh=False)
+                              pbar.set_postfix({"loc": location_name[:10], "files": found_count, "matched": matched_count}, refresh=False)
 
                 except Exception as e:
                     logger.error(f"Error scanning location {location_name} ({location_root}): {e}")
                     # How to update pbar if a whole location fails? Difficult to estimate dirs. Log and continue.
 
             # Ensure final postfix update reflects the end state
-            pbar.set_postfix({"files": found_count, "matched": len(matched_files_info)}, refresh=True)
+            pbar.set_postfix({"files": found_count, "matched": matched_count}, refresh=True)
 
         elapsed = time.time() - start_time
         rate = found_count / elapsed if elapsed > 0 else 0
         logger.info(f"Scanning summary:")
         logger.info(f"Locations scanned: {effective_locations_count}")
         logger.info(f"Total files found: {found_count}")
-        logger.info(f"Files matched to components: {len(matched_files_info)}")
+        logger.info(f"Files matched to components: {matched_count}")
         logger.info(f"Unmatched files: {len(unmatched_files)}")
         logger.info(f"Scanning rate: {rate:.0f} files/sec")
 
-        # Second pass: Group files by track and create index entries using symbolic paths
-        logger.info("Creating tracks from matched files...")
-        # Group by (location_name, artist, album, cd_number, base_name) which defines a track instance
-        # Key: (loc, artist, album, cd, base) -> Value: List of (comp_name, abs_path, size)
-        tracks_grouped = defaultdict(list)
-
-        component_counts = defaultdict(int)
-        component_sizes = defaultdict(int)
-
-        with tqdm(total=len(matched_files_info), desc="Grouping files", unit="file") as pbar:
-            for abs_path, location_name, comp_name, base_name, size in matched_files_info:
-                pbar.update(1)
-                try:
-                    location_root = location_roots[location_name]
-                    rel_path_in_loc = abs_path.relative_to(location_root)
-                    parts = rel_path_in_loc.parent.parts
-
-                    # Validate structure: Artist/Album/[CDx]/track_base_comp.ext
-                    if len(parts) < 2 or len(parts) > 3:
-                        logger.warning(f"Skipping file with unexpected directory structure: {location_name}/{rel_path_in_loc}")
-                        continue
-                    artist = parts[0]
-                    album = parts[1]
-
-                    cd_number = None
-                    expected_parent_parts = 2 # Artist/Album
-                    # Check for standard CD structure: Artist/Album/CDX/...
-                    if len(parts) == 3 and parts[2].startswith('CD') and parts[2][2:].isdigit():
-                        cd_number = parts[2]
-                        expected_parent_parts = 3 # Artist/Album/CDX
-
-                    # Ensure the file is directly within the expected level (Artist/Album or Artist/Album/CDX)
-                    # This check implicitly handles len(parts) < 2 as well, as expected_parent_parts would be 2 or 3.
-                    if len(parts) != expected_parent_parts:
-                        logger.warning(f"Skipping file with unexpected directory structure (not at expected depth): {location_name}/{rel_path_in_loc}")
-                        continue
-
-                    # Define the unique key for this track instance in this location
-                    track_key = (location_name, artist, album, cd_number, base_name)
-                    tracks_grouped[track_key].append((comp_name, abs_path, size))
-
-                    # Aggregate stats (will be stored per-location later if needed)
-                    component_counts[comp_name] += 1
-                    component_sizes[comp_name] += size
-                    index.total_size += size # Aggregate total size for now
-
-                    # Update per-location file count and size stats
-                    location_file_counts[location_name] += 1
-                    location_total_sizes[location_name] += size
-
-                except ValueError as e:
-                    logger.warning(f"Path structure error for {abs_path} relative to {location_root}: {e}. Skipping grouping.")
-                except KeyError:
-                    logger.error(f"Location name '{location_name}' mismatch for path {abs_path} during grouping. This shouldn't happen.")
-                except Exception as e:
-                    logger.error(f"Unexpected error grouping file {abs_path}: {e}")
-
         logger.info(f"Grouped matched files into {len(tracks_grouped)} unique track instances.")
 
+        # Album/artist lookups are accumulated as lists in the hot loop and
+        # converted to sets once all tracks are processed.
+        track_by_album_tmp: Dict[str, List[str]] = defaultdict(list)
+        album_by_artist_tmp: Dict[str, List[str]] = defaultdict(list)
+
         # Create TrackInfo objects and populate index using symbolic paths
         with tqdm(total=len(tracks_grouped), desc="Creating index entries", unit="track") as pbar:
             for (location_name, artist, album, cd_number, base_name), components_info in tracks_grouped.items():
@@ -434,59 +689,46 @@ class DatasetIndex:
                 # Full symbolic track path including location name
                 symbolic_track_path = f"{location_name}/{symbolic_track_relative}"
 
-                # Create TrackInfo
-                track = TrackInfo(
-                    track_path=symbolic_track_path, # Key: full symbolic path to the track base in its location
-                    artist=artist,
-                    album_path=symbolic_album_path, # Store symbolic album path (Location/Artist/Album)
-                    cd_number=cd_number,
-                    base_name=base_name,
-                    files={}, # component_name -> symbolic_file_path
-                    file_sizes={} # symbolic_file_path -> size
-                )
+                track_files: Dict[str, str] = {} # component_name -> symbolic_file_path
+                track_file_sizes: Dict[str, int] = {} # symbolic_file_path -> size
 
                 # Add component files with their symbolic paths and calculate hashes
-                all_components_added = True
-                for comp_name, abs_path, size in components_info:
-                    try:
-                        rel_path_in_loc = abs_path.relative_to(location_roots[location_name])
-                        symbolic_file_path = f"{location_name}/{rel_path_in_loc}"
-                        track.files[comp_name] = symbolic_file_path
-                        track.file_sizes[symbolic_file_path] = size
-
-                        # Calculate and store file hash
-                        file_hash = hash(symbolic_file_path)
-                        if file_hash in index.file_info_by_hash:
-                            # Hash collision or duplicate file path (potentially across locations)
-                            existing_path, existing_size = index.file_info_by_hash[file_hash]
-                            if existing_path != symbolic_file_path:
-                                logger.warning(f"Hash collision detected: hash({symbolic_file_path}) == hash({existing_path}). "
-                                               f"This might impact resume functionality for one of these files.")
-                            # If path is the same, it's likely a rescan or duplicate in grouping, allow overwrite/update
-                            # If sizes differ for the same path, it's data inconsistency. Log it.
-                            elif existing_size != size:
-                                 logger.warning(f"File size mismatch for {symbolic_file_path} during indexing. Previous: {existing_size}, New: {size}.")
-                        index.file_info_by_hash[file_hash] = (symbolic_file_path, size)
-
-                    except ValueError:
-                        logger.warning(f"Could not form relative path for {abs_path} in {location_name}. Skipping component {comp_name} for track {symbolic_track_path}")
-                        all_components_added = False
-                    except KeyError:
-                        logger.error(f"Location name '{location_name}' mismatch for path {abs_path} during TrackInfo creation.")
-                        all_components_added = False
-
-                # Only add track to index if all its found components could be processed
-                if all_components_added and track.files:
+                for comp_name, symbolic_file_path, size in components_info:
+                    track_files[comp_name] = symbolic_file_path
+                    track_file_sizes[symbolic_file_path] = size
+
+                    # Calculate and store file hash
+                    file_hash = hash(symbolic_file_path)
+                    if file_hash in index.file_info_by_hash:
+                        # Hash collision or duplicate file path (potentially across locations)
+                        existing_path, existing_size = index.file_info_by_hash[file_hash]
+                        if existing_path != symbolic_file_path:
+                            logger.warning(f"Hash collision detected: hash({symbolic_file_path}) == hash({existing_path}). "
+                                           f"This might impact resume functionality for one of these files.")
+                        # If path is the same, it's likely a rescan or duplicate in grouping, allow overwrite/update
+                        # If sizes differ for the same path, it's data inconsistency. Log it.
+                        elif existing_size != size:
+                             logger.warning(f"File size mismatch for {symbolic_file_path} during indexing. Previous: {existing_size}, New: {size}.")
+                    index.file_info_by_hash[file_hash] = (symbolic_file_path, size)
+
+                if track_files:
+                    track = TrackInfo(
+                        track_path=symbolic_track_path, # Key: full symbolic path to the track base in its location
+                        artist=artist,
+                        album_path=symbolic_album_path, # Store symbolic album path (Location/Artist/Album)
+                        cd_number=cd_number,
+                        base_name=base_name,
+                        files=track_files,
+                        file_sizes=track_file_sizes
+                    )
                     # Update index lookups with symbolic paths
                     if symbolic_track_path in index.tracks:
                         logger.warning(f"Duplicate symbolic track path detected: {symbolic_track_path}. Overwriting entry. This indicates a track base name exists in multiple locations, or data duplication.")
                     index.tracks[symbolic_track_path] = track
-                    index.track_by_album.setdefault(symbolic_album_path, set()).add(symbolic_track_path)
-                    index.album_by_artist.setdefault(artist, set()).add(symbolic_album_path)
-                elif not track.files:
-                     logger.debug(f"Track {symbolic_track_path} had no processable components, not adding to index.")
+                    track_by_album_tmp[symbolic_album_path].append(symbolic_track_path)
+                    album_by_artist_tmp[artist].append(symbolic_album_path)
                 else:
-                    logger.warning(f"Track {symbolic_track_path} skipped due to errors processing components.")
+                     logger.debug(f"Track {symbolic_track_path} had no processable components, not adding to index.")
 
                 if progress_callback:
                     if pbar.total > 0:
@@ -497,6 +739,10 @@ class DatasetIndex:
                 location_albums[location_name].add(symbolic_album_path)
                 location_artists[location_name].add(artist)
 
+        # Deduplicate album/artist lookups once at the end
+        index.track_by_album = {album: set(tracks) for album, tracks in track_by_album_tmp.items()}
+        index.album_by_artist = {artist: set(albums) for artist, albums in album_by_artist_tmp.items()}
+
         # Print detailed indexing results
         logger.info("\nFinal Indexing Results:")
         logger.info(f"Locations processed: {effective_locations_count} / {len(location_roots)}")
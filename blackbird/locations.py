@@ -1,7 +1,34 @@
+import functools
 import json
 import os
+import stat
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .utils import atomic_write_bytes
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# locations.json files modified less than this long ago are not cached: a
+# same-size rewrite within the filesystem's timestamp granularity would leave
+# both mtime and size unchanged
+LOCATIONS_CACHE_RACY_WINDOW_NS = 2_000_000_000
+
+# Dataset roots already checked by LocationsManager: absolute path -> resolved path
+_VALIDATED_ROOTS: Dict[str, Path] = {}
 
 class LocationsManagerError(Exception):
     """Base exception for LocationsManager errors."""
@@ -12,20 +39,91 @@ class LocationValidationError(LocationsManagerError):
     pass
 
 class SymbolicPathError(LocationsManagerError):
-    """Error during symbolic path resolution."""
-    pass
+    """Error during symbolic path resolution.
+
+    Raised either with a ready message, or with a ``kind`` plus the raw
+    ``symbolic_path``/``extra`` values, in which case the message is only
+    formatted when the error is displayed. Callers that resolve many paths
+    and skip failures then don't pay for building messages nobody reads.
+    """
+
+    _TEMPLATES = {
+        'format': "Invalid symbolic path format: '{path}'. Expected 'LocationName/Rest/Of/Path' or just 'LocationName'.",
+        'empty_location': "Symbolic path '{path}' has an empty location name part.",
+        'relative_part': "Symbolic path '{path}' has an invalid or directory-like relative path part: '{extra}'",
+        'unknown_location': "Unknown location name '{location}' in symbolic path '{path}'. Available locations: {available}",
+    }
+
+    def __init__(self, message: Optional[str] = None, *, kind: Optional[str] = None,
+                 symbolic_path: Optional[str] = None, extra: object = None):
+        super().__init__(message)
+        self.kind = kind
+        self.symbolic_path = symbolic_path
+        self.extra = extra
+
+    def __str__(self) -> str:
+        if self.kind is None:
+            return super().__str__()
+        if self.kind == 'unknown_location':
+            location_name, locations = self.extra
+            return self._TEMPLATES[self.kind].format(
+                location=location_name, path=self.symbolic_path, available=list(locations.keys()))
+        return self._TEMPLATES[self.kind].format(path=self.symbolic_path, extra=self.extra)
+
+def _check_location_dir(path_str: str) -> Optional[str]:
+    """Returns an error message if path_str is not an existing directory, else None."""
+    try:
+        st = os.stat(path_str)
+    except FileNotFoundError:
+        return f"Path '{path_str}' does not exist."
+    except OSError as e:
+        return f"Path '{path_str}' could not be accessed: {e}"
+    if not stat.S_ISDIR(st.st_mode):
+        return f"Path '{path_str}' exists but is not a directory."
+    return None
+
+def _decode_locations_json(raw: bytes, file_path: Path) -> Dict[str, str]:
+    """Decodes locations.json contents into a name -> path string mapping.
 
-def resolve_symbolic_path(symbolic_path: str, locations: Dict[str, Path]) -> Path:
+    Uses msgspec (typed decode in C) when installed, otherwise the stdlib json module.
+
+    Raises:
+        LocationValidationError: If the data is not valid JSON or not a JSON object.
+    """
+    if MSGSPEC_AVAILABLE:
+        try:
+            return msgspec.json.decode(raw, type=Dict[str, str])
+        except msgspec.ValidationError as e:
+            raise LocationValidationError(f"Invalid format in {file_path}. Expected a JSON object mapping names to path strings: {e}") from e
+        except msgspec.DecodeError as e:
+            raise LocationValidationError(f"Error decoding JSON from {file_path}: {e}") from e
+
+    try:
+        loaded = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise LocationValidationError(f"Error decoding JSON from {file_path}: {e}") from e
+    if not isinstance(loaded, dict):
+        raise LocationValidationError(f"Invalid format in {file_path}. Expected a JSON object.")
+    return loaded
+
+def resolve_symbolic_path(symbolic_path: str, locations: Dict[str, Union[str, Path]]) -> Path:
     """
     Resolves a symbolic path (e.g., 'Main/Artist/Album/track.mp3') to an absolute path.
 
     Args:
         symbolic_path: The symbolic path string.
-        locations: A dictionary mapping location names to their absolute base Paths.
+        locations: A dictionary mapping location names to their absolute base paths
+            (str or Path; ``LocationsManager.get_all_location_strings`` avoids Path objects).
 
     Returns:
         The resolved absolute Path object.
 
+    Base path checks are memoized per (location, base path); the cache is
+    bounded and is cleared whenever a ``LocationsManager`` loads, saves, adds
+    or removes locations, or by ``LocationsManager.flush_cache()``. Between
+    those points a base path is not re-checked, so call ``flush_cache()``
+    after unmounting a location.
+
     Raises:
         SymbolicPathError: If the symbolic path format is invalid or the location name is not found.
         ValueError: If symbolic_path or locations is empty or invalid.
@@ -35,43 +133,30 @@ def resolve_symbolic_path(symbolic_path: str, locations: Dict[str, Path]) -> Pat
     if not locations or not isinstance(locations, dict):
          raise ValueError("Locations must be a non-empty dictionary.")
 
-    # Ensure locations dictionary maps name -> string path for lookup
-    locations_str_map: Dict[str, str] = {}
-    for loc_name, loc_path in locations.items():
-        if isinstance(loc_path, Path):
-            locations_str_map[loc_name] = str(loc_path)
-        elif isinstance(loc_path, str):
-            locations_str_map[loc_name] = loc_path
+    location_name, sep, relative_path_str = symbolic_path.partition('/')
+    if not sep:
+        if symbolic_path in locations:
+            relative_path_str = "." # Bare location name refers to the location root
         else:
-            raise ValueError(f"Location '{loc_name}' has an invalid path type: {type(loc_path)}. Expected Path or str.")
-
-    parts = symbolic_path.split('/', 1)
-    if len(parts) == 1 and symbolic_path in locations_str_map:
-         location_name = symbolic_path
-         relative_path_str = "."
-    elif len(parts) == 2:
-        location_name, relative_path_str = parts
-    else:
-        raise SymbolicPathError(f"Invalid symbolic path format: '{symbolic_path}'. Expected 'LocationName/Rest/Of/Path' or just 'LocationName'.")
+            raise SymbolicPathError(kind='format', symbolic_path=symbolic_path)
 
     if not location_name:
-         raise SymbolicPathError(f"Symbolic path \'{symbolic_path}\' has an empty location name part.")
+         raise SymbolicPathError(kind='empty_location', symbolic_path=symbolic_path)
     if not relative_path_str.strip('/'): # Allow '.' for location root
-         raise SymbolicPathError(f"Symbolic path \'{symbolic_path}\' has an invalid or directory-like relative path part: '{relative_path_str}'")
+         raise SymbolicPathError(kind='relative_part', symbolic_path=symbolic_path, extra=relative_path_str)
 
-    if location_name not in locations_str_map:
-        raise SymbolicPathError(f"Unknown location name '{location_name}' in symbolic path '{symbolic_path}'. Available locations: {list(locations_str_map.keys())}")
+    if location_name not in locations:
+        raise SymbolicPathError(kind='unknown_location', symbolic_path=symbolic_path, extra=(location_name, locations))
 
-    base_path_str = locations_str_map[location_name]
-    try:
-        # Use strict=False initially for base path resolution, then check is_dir
-        base_path = Path(base_path_str).resolve(strict=False)
-        if not base_path.exists():
-            raise SymbolicPathError(f"Base path for location '{location_name}' ('{base_path_str}') does not exist.")
-        if not base_path.is_dir():
-            raise SymbolicPathError(f"Base path for location '{location_name}' ('{base_path}') is not a directory.")
-    except Exception as e:
-         raise SymbolicPathError(f"Error resolving or validating base path for location '{location_name}' ('{base_path_str}'): {e}") from e
+    # Only the location actually used is converted to a string
+    base_path = locations[location_name]
+    if isinstance(base_path, str):
+        base_path_str = base_path
+    elif isinstance(base_path, Path):
+        base_path_str = os.fspath(base_path)
+    else:
+        raise ValueError(f"Location '{location_name}' has an invalid path type: {type(base_path)}. Expected Path or str.")
+    base_path = _validate_base(location_name, base_path_str)
 
     # Construct the final path.
     try:
@@ -85,7 +170,74 @@ def resolve_symbolic_path(symbolic_path: str, locations: Dict[str, Path]) -> Pat
         return absolute_path
     except Exception as e:
         # Catch potential errors during path joining or resolution
-        raise SymbolicPathError(f"Error constructing or resolving final path for symbolic path \'{symbolic_path}\': {e}") from e
+        raise SymbolicPathError(f"Error constructing or resolving final path for symbolic path '{symbolic_path}': {e}") from e
+
+@functools.lru_cache(maxsize=1024)
+def _validate_base(location_name: str, base_path_str: str) -> Path:
+    """Resolves and validates a location base path once per (name, path) pair."""
+    try:
+        # Use strict=False initially for base path resolution, then check is_dir
+        base_path = Path(base_path_str).resolve(strict=False)
+        if not base_path.exists():
+            raise SymbolicPathError(f"Base path for location '{location_name}' ('{base_path_str}') does not exist.")
+        if not base_path.is_dir():
+            raise SymbolicPathError(f"Base path for location '{location_name}' ('{base_path}') is not a directory.")
+    except Exception as e:
+         raise SymbolicPathError(f"Error resolving or validating base path for location '{location_name}' ('{base_path_str}'): {e}") from e
+    return base_path
+
+def _clear_resolution_caches() -> None:
+    """Forget memoized base path checks."""
+    _validate_base.cache_clear()
+
+def make_resolver(locations: Dict[str, Union[str, Path]]) -> Callable[[str], str]:
+    """
+    Builds a fast symbolic path resolver specialized for a fixed set of locations.
+
+    Every base path is validated once up front; the returned function then only
+    splits the symbolic path and concatenates strings. Intended for loops over
+    many paths with stable locations::
+
+        resolver = make_resolver(manager.get_all_location_strings())
+        for symbolic_path in paths:
+            absolute_path = resolver(symbolic_path)
+
+    Unlike ``resolve_symbolic_path`` the result is a plain string and is not
+    normalized, except that paths containing '..' (or otherwise unusual paths)
+    are delegated to ``resolve_symbolic_path``.
+
+    Args:
+        locations: A dictionary mapping location names to their absolute base paths.
+
+    Returns:
+        A function mapping a symbolic path to an absolute path string. It raises
+        SymbolicPathError for unknown locations or locations whose base path is invalid.
+    """
+    bases: Dict[str, str] = {}
+    base_errors: Dict[str, SymbolicPathError] = {}
+    for location_name, base_path in locations.items():
+        try:
+            bases[location_name] = os.fspath(_validate_base(location_name, os.fspath(base_path)))
+        except SymbolicPathError as e:
+            base_errors[location_name] = e
+    path_sep = os.sep
+
+    def resolve(symbolic_path: str) -> str:
+        location_name, sep, relative_path_str = symbolic_path.partition('/')
+        try:
+            base = bases[location_name]
+        except KeyError:
+            if location_name in base_errors:
+                raise base_errors[location_name] from None
+            raise SymbolicPathError(kind='unknown_location', symbolic_path=symbolic_path,
+                                    extra=(location_name, locations)) from None
+        if not sep:
+            return base
+        if not relative_path_str or '..' in relative_path_str:
+            return os.fspath(resolve_symbolic_path(symbolic_path, bases))
+        return base + path_sep + relative_path_str
+
+    return resolve
 
 class LocationsManager:
     """Manages dataset storage locations defined in .blackbird/locations.json."""
@@ -94,16 +246,49 @@ class LocationsManager:
     LOCATIONS_FILENAME = "locations.json"
     BLACKBIRD_DIR_NAME = ".blackbird"
 
+    __slots__ = ("dataset_root_path", "_locations_file_path", "_locations", "_loaded")
+
+    # Parsed locations files shared by all instances:
+    # file path -> (st_mtime_ns, st_size, locations)
+    _cache: Dict[Path, Tuple[int, int, Dict[str, str]]] = {}
+
     def __init__(self, dataset_root_path: Path):
-        if not dataset_root_path or not dataset_root_path.is_dir():
+        if not dataset_root_path:
             raise ValueError(f"Dataset root path '{dataset_root_path}' is not a valid directory.")
-        self.dataset_root_path = dataset_root_path.resolve()
-        self._locations: Dict[str, Path] = {} # Internal storage uses Path objects
+        # Each root is checked and resolved once per process; see flush_root_cache().
+        # Keyed on the absolute path so relative roots stay correct if the cwd changes.
+        root_key = os.path.abspath(dataset_root_path)
+        resolved_root = _VALIDATED_ROOTS.get(root_key)
+        if resolved_root is None:
+            if not dataset_root_path.is_dir():
+                raise ValueError(f"Dataset root path '{dataset_root_path}' is not a valid directory.")
+            resolved_root = dataset_root_path.resolve()
+            _VALIDATED_ROOTS[root_key] = resolved_root
+        self.dataset_root_path = resolved_root
+        self._locations_file_path = resolved_root / self.BLACKBIRD_DIR_NAME / self.LOCATIONS_FILENAME
+        # Internal storage uses plain path strings; Path objects are built only at the public getters
+        self._locations: Dict[str, str] = {}
+        self._loaded = False # Set once load_locations has run; file I/O is deferred until then
 
     @property
     def locations_file_path(self) -> Path:
         """Returns the absolute path to the locations configuration file."""
-        return self.dataset_root_path / self.BLACKBIRD_DIR_NAME / self.LOCATIONS_FILENAME
+        return self._locations_file_path
+
+    @staticmethod
+    def flush_root_cache() -> None:
+        """Forget validated dataset roots.
+
+        Call this if a dataset root may have been removed, replaced or re-linked
+        since a manager was last constructed for it.
+        """
+        _VALIDATED_ROOTS.clear()
+
+    @classmethod
+    def flush_cache(cls) -> None:
+        """Forget cached locations files and symbolic path resolutions."""
+        cls._cache.clear()
+        _clear_resolution_caches()
 
     def load_locations(self) -> Dict[str, Path]:
         """
@@ -111,35 +296,51 @@ class LocationsManager:
 
         If the file doesn't exist, initializes with a default 'Main' location
         pointing to the dataset root. If the file is invalid, raises an error.
+        Parsed files are cached and reused while their mtime and size are unchanged;
+        files modified within ``LOCATIONS_CACHE_RACY_WINDOW_NS`` are always re-read.
+
+        Stored paths are made absolute and normalized but symlinks in them are
+        kept as written, not canonicalized; ``add_location`` resolves new paths.
 
         Returns:
             A dictionary mapping location names to their resolved absolute Paths.
         """
         file_path = self.locations_file_path
         loaded_locations_str: Dict[str, str] = {}
+        # Locations are (re)loaded, so check their base paths again on next use
+        _clear_resolution_caches()
+
+        # A single stat both checks for the file and feeds the cache validation
+        try:
+            file_stat = os.stat(file_path)
+        except (FileNotFoundError, NotADirectoryError):
+            file_stat = None # Missing (or a dangling symlink), fall through to default logic
+
+        if file_stat is not None:
+            cached = self._cache.get(file_path)
+            if cached is not None and cached[:2] == (file_stat.st_mtime_ns, file_stat.st_size):
+                self._locations = cached[2].copy()
+                self._loaded = True
+                return self.get_all_locations()
 
-        if file_path.exists():
             try:
-                with open(file_path, 'r') as f:
-                    loaded_locations_str = json.load(f)
-                if not isinstance(loaded_locations_str, dict):
-                    raise LocationValidationError(f"Invalid format in {file_path}. Expected a JSON object.")
+                loaded_locations_str = _decode_locations_json(file_path.read_bytes(), file_path)
                 # Allow empty file, will fall through to default
                 # if not loaded_locations:
                 #     raise LocationValidationError(f"{file_path} is empty. Expected at least one location.")
-            except json.JSONDecodeError as e:
-                raise LocationValidationError(f"Error decoding JSON from {file_path}: {e}") from e
             except FileNotFoundError:
                 pass # Fall through to default logic
 
         if not loaded_locations_str:
             # Default case: file doesn't exist or was empty
             print(f"Locations file not found or empty at {file_path}. Using default location '{self.DEFAULT_LOCATION_NAME}': {self.dataset_root_path}")
-            self._locations = {self.DEFAULT_LOCATION_NAME: self.dataset_root_path}
-            return self._locations # Return the default
+            self._locations = {sys.intern(self.DEFAULT_LOCATION_NAME): str(self.dataset_root_path)}
+            self._loaded = True
+            return self.get_all_locations() # Return the default
 
-        # Validate and resolve paths, store Path objects internally
-        validated_locations: Dict[str, Path] = {}
+        # Validate and resolve paths, store normalized path strings internally
+        # (type checks are redundant after a msgspec decode but cover the json fallback)
+        validated_locations: Dict[str, str] = {}
         for name, path_str in loaded_locations_str.items():
             if not isinstance(name, str) or not name:
                  raise LocationValidationError(f"Invalid location name found in {file_path}: {name!r}. Names must be non-empty strings.")
@@ -147,38 +348,49 @@ class LocationsManager:
                  raise LocationValidationError(f"Invalid path value for location '{name}' in {file_path}: {path_str!r}. Paths must be strings.")
 
             try:
-                path = Path(path_str)
-                # Resolve the path to make it absolute and canonical
-                # Use strict=False here, validation happens in add/use
-                resolved_path = path.resolve(strict=False)
+                # Make the path absolute and normalized without touching the filesystem
+                # (no per-component readlink/lstat); validation happens in add/use
+                resolved_path = os.path.abspath(path_str)
                 # Basic check if it seems like a plausible path, more checks later
-                if not resolved_path.is_absolute():
+                if not os.path.isabs(resolved_path):
                      raise LocationValidationError(f"Path for location '{name}' ('{path_str}') did not resolve to an absolute path: {resolved_path}")
 
-                validated_locations[name] = resolved_path
+                # Location names prefix every symbolic path; share one string object per name
+                validated_locations[sys.intern(name)] = resolved_path
             except Exception as e:
                 # Catch potential errors during path resolution
                 raise LocationValidationError(f"Error resolving path for location '{name}' ('{path_str}'): {e}") from e
 
+        if time.time_ns() - file_stat.st_mtime_ns >= LOCATIONS_CACHE_RACY_WINDOW_NS:
+            self._cache[file_path] = (file_stat.st_mtime_ns, file_stat.st_size, validated_locations.copy())
         self._locations = validated_locations
-        return self._locations
+        self._loaded = True
+        return self.get_all_locations()
 
     def save_locations(self) -> None:
-        """Saves the current location definitions to .blackbird/locations.json."""
+        """Saves the current location definitions to .blackbird/locations.json.
+
+        The file is replaced atomically, so readers never see a partially written file.
+        """
         if not self._locations:
              raise LocationsManagerError("Cannot save empty locations. Load or add locations first.")
              
         file_path = self.locations_file_path
         blackbird_dir = file_path.parent
         
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(self._locations, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(self._locations, indent=2).encode('utf-8')
+
         try:
             blackbird_dir.mkdir(parents=True, exist_ok=True)
-            # Convert Path objects back to strings for JSON serialization
-            locations_to_save = {name: str(path) for name, path in self._locations.items()}
-            with open(file_path, 'w') as f:
-                json.dump(locations_to_save, f, indent=2)
+            atomic_write_bytes(file_path, payload)
         except OSError as e:
             raise LocationsManagerError(f"Error saving locations file to {file_path}: {e}") from e
+        finally:
+            self._cache.pop(file_path, None)
+            _clear_resolution_caches()
 
     def get_location_path(self, name: str) -> Path:
         """
@@ -193,11 +405,13 @@ class LocationsManager:
         Raises:
             KeyError: If the location name is not found.
         """
-        if not self._locations:
+        if self._loaded and name in self._locations:
+            return Path(self._locations[name])
+        if not self._loaded:
              self.load_locations() # Try loading if not already loaded
         if name not in self._locations:
              raise KeyError(f"Location '{name}' not found. Available locations: {list(self._locations.keys())}")
-        return self._locations[name]
+        return Path(self._locations[name])
 
     def get_all_locations(self) -> Dict[str, Path]:
         """
@@ -206,11 +420,25 @@ class LocationsManager:
         Returns:
             A copy of the internal locations dictionary (paths as Path objects).
         """
-        if not self._locations:
+        if not self._loaded:
+             self.load_locations() # Try loading if not already loaded
+        return {name: Path(path) for name, path in self._locations.items()}
+
+    def get_all_location_strings(self) -> Dict[str, str]:
+        """
+        Gets a dictionary of all location names mapped to their absolute path strings.
+
+        Cheaper than ``get_all_locations`` for hot callers such as
+        ``resolve_symbolic_path`` since no Path objects are created.
+
+        Returns:
+            A copy of the internal locations dictionary.
+        """
+        if not self._loaded:
              self.load_locations() # Try loading if not already loaded
         return self._locations.copy()
 
-    def add_location(self, name: str, path_str: str) -> None:
+    def add_location(self, name: str, path_str: str, *, validate: bool = True) -> None:
         """
         Adds a new storage location. Does not save automatically.
         # Validates the path can be resolved but does not require it to exist.
@@ -218,16 +446,19 @@ class LocationsManager:
         Args:
             name: The unique name for the location.
             path_str: The absolute path string to the location directory.
+            validate: Check that the path exists and is a directory (resolving
+                symlinks). Bulk callers can pass False, store the path only
+                made absolute, and check everything later with validate_all_locations().
 
         Raises:
             LocationValidationError: If the name or path is invalid.
         """
         if not isinstance(name, str) or not name.strip():
             raise LocationValidationError("Location name cannot be empty.")
-        name = name.strip()
+        name = sys.intern(name.strip())
 
         # Load current locations if not loaded
-        if not self._locations:
+        if not self._loaded:
             self.load_locations()
         if name in self._locations:
             raise LocationValidationError(f"Location name '{name}' already exists.")
@@ -235,26 +466,51 @@ class LocationsManager:
         if not isinstance(path_str, str) or not path_str.strip():
             raise LocationValidationError("Location path cannot be empty.")
 
+        if not validate:
+            self._locations[name] = os.path.abspath(path_str)
+            _clear_resolution_caches()
+            return
+
+        # One stat of the symlink-resolved path checks both existence and type
         try:
-             path = Path(path_str)
-             # Revert to strict check
-             resolved_path = path.resolve(strict=True) 
-             if not resolved_path.is_dir():
-                 raise LocationValidationError(f"Path '{resolved_path}' exists but is not a directory.")
-             # if not resolved_path.is_absolute():
-             #     raise LocationValidationError(f"Path '{path_str}' did not resolve to an absolute path: {resolved_path}")
+            resolved_path = os.path.realpath(path_str)
+            mode = os.stat(resolved_path).st_mode
         except FileNotFoundError:
-             # Re-add strict check exception
-             raise LocationValidationError(f"Path '{path_str}' does not exist.")
+            raise LocationValidationError(f"Path '{path_str}' does not exist.")
         except Exception as e:
-             # Catch other potential errors during Path creation or resolution
-             raise LocationValidationError(f"Invalid path '{path_str}': {e}") from e
+            # Catch other potential errors during path resolution
+            raise LocationValidationError(f"Invalid path '{path_str}': {e}") from e
+        if not stat.S_ISDIR(mode):
+            raise LocationValidationError(f"Path '{resolved_path}' exists but is not a directory.")
 
-        # Store the validated Path object internally
+        # Store the validated path internally
         self._locations[name] = resolved_path
+        _clear_resolution_caches()
         # Removing this print statement just in case it causes issues
         # print(f"Location '{name}' added with path '{resolved_path}'. Call save_locations() to persist.")
 
+    def validate_all_locations(self) -> List[Tuple[str, str]]:
+        """
+        Checks that every location path exists and is a directory.
+
+        The stat calls run concurrently in a thread pool, so locations on
+        network mounts cost roughly one round trip in total instead of one each.
+
+        Returns:
+            A list of (name, error message) tuples for invalid locations; empty if all are valid.
+        """
+        if not self._loaded:
+            self.load_locations()
+
+        names = list(self._locations)
+        paths = [self._locations[name] for name in names]
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+                results = list(executor.map(_check_location_dir, paths))
+        else:
+            results = [_check_location_dir(path_str) for path_str in paths]
+        return [(name, error) for name, error in zip(names, results) if error is not None]
+
     def remove_location(self, name: str) -> None:
         """
         Removes a storage location. Does not save automatically.
@@ -265,7 +521,7 @@ class LocationsManager:
         Raises:
             LocationValidationError: If the name is invalid or cannot be removed.
         """
-        if not self._locations:
+        if not self._loaded:
             self.load_locations()
 
         if name not in self._locations:
@@ -275,4 +531,5 @@ class LocationsManager:
             raise LocationValidationError(f"Cannot remove the default location '{self.DEFAULT_LOCATION_NAME}' when it is the only location.")
 
         del self._locations[name]
+        _clear_resolution_caches()
         print(f"Location '{name}' removed. Call save_locations() to persist.") 
\ No newline at end of file
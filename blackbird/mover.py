@@ -1,17 +1,103 @@
+import errno
 import os
 import shutil
-import time
+import stat
+import sys
 import logging
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import List, Optional, Dict, Tuple
 
 from .dataset import Dataset
 from . import operations
 from .utils import format_size
-from .locations import SymbolicPathError
+from .locations import SymbolicPathError, make_resolver
+
+try:
+    import fcntl
+    # FICLONE is only exported by fcntl from Python 3.12 on
+    FICLONE = getattr(fcntl, 'FICLONE', 0x40049409) if sys.platform.startswith('linux') else None
+except ImportError:
+    fcntl = None
+    FICLONE = None
 
 logger = logging.getLogger(__name__)
 
+# errno values meaning "the kernel can't do this copy", as opposed to real I/O errors
+_KERNEL_COPY_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF,
+                            errno.EOPNOTSUPP, errno.ENOTTY, errno.EPERM}
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copies ``size`` bytes between file descriptors without a userspace buffer.
+
+    Tries a reflink (FICLONE) first, which shares the data blocks on
+    filesystems like Btrfs and XFS, then ``os.copy_file_range``.
+
+    Returns:
+        False if the kernel can't copy between these files; the caller should
+        fall back to a regular copy.
+    """
+    if FICLONE is not None:
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return True
+        except OSError:
+            pass
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            sent = os.copy_file_range(src_fd, dst_fd, size - copied)
+            if sent == 0:
+                break
+            copied += sent
+    except OSError as e:
+        if e.errno in _KERNEL_COPY_UNSUPPORTED:
+            return False
+        raise
+    return copied == size
+
+
+def _fast_copy(src: str, dst: str) -> str:
+    """``copy_function`` for ``shutil.move`` when source and target are on different filesystems.
+
+    Copies the data in the kernel where possible and falls back to
+    ``shutil.copy2`` otherwise. Metadata is copied like ``copy2`` does.
+    """
+    if FICLONE is None and not hasattr(os, 'copy_file_range'):
+        return shutil.copy2(src, dst)
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        copied = _kernel_copy(fsrc.fileno(), fdst.fileno(), os.fstat(fsrc.fileno()).st_size)
+    if not copied:
+        return shutil.copy2(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
+
+def _move_file(abs_source_path: str, abs_target_path: str, size: int) -> None:
+    """Moves a single file; the target directory must already exist.
+
+    A source that is already gone while the target exists with the expected
+    size was moved by an earlier run that stopped before recording it, and
+    counts as moved.
+    """
+    try:
+        shutil.move(abs_source_path, abs_target_path, copy_function=_fast_copy)
+    except FileNotFoundError:
+        # One stat of the target plus an lstat of the source
+        try:
+            target_st = os.stat(abs_target_path)
+        except OSError:
+            target_st = None
+        if (target_st is not None and stat.S_ISREG(target_st.st_mode) and target_st.st_size == size
+                and not os.path.lexists(abs_source_path)):
+            logger.info(f"{abs_source_path} was already moved to {abs_target_path}")
+            return
+        raise
+
+
 def move_data(
     dataset: Dataset,
     source_location_name: str,
@@ -21,6 +107,7 @@ def move_data(
     dry_run: bool = False,
     operation_state: Optional[Dict] = None,
     state_file_path: Optional[Path] = None,
+    parallel: int = 1,
 ) -> Dict:
     """
     Moves data between storage locations within the dataset.
@@ -30,6 +117,7 @@ def move_data(
         source_location_name: The name of the source storage location.
         target_location_name: The name of the target storage location.
         size_limit_gb: Optional limit in GB for the amount of data to move.
+                       Requires an index built with file sizes.
         specific_folders: Optional list of folder paths relative to the source
                           location root to move. If None, considers all data
                           in the source location.
@@ -37,6 +125,9 @@ def move_data(
         operation_state: If provided, resumes a previous move operation using
                          this loaded state.
         state_file_path: If provided (when resuming), the path to the state file.
+        parallel: Number of files moved concurrently (1 for sequential). Moves
+                  across filesystems copy the data, so keep this low for
+                  spinning disks.
 
     Returns:
         A dictionary containing statistics about the move operation.
@@ -51,13 +142,19 @@ def move_data(
 
     if dataset.index is None:
         raise RuntimeError("Dataset index not loaded. Please run 'reindex' first.")
+    if size_limit_gb is not None and not dataset.index.sizes_collected:
+        raise ValueError("The dataset index was built without file sizes; rebuild it with sizes "
+                         "before moving data with a size limit.")
 
     logger.info(f"Starting move from '{source_location_name}' to '{target_location_name}'.")
     if dry_run:
         logger.warning("Performing a DRY RUN. No files will actually be moved.")
 
     # --- 1. Identify candidate files ---
-    candidate_files: List[Tuple[int, str, int]] = [] # (hash, symbolic_path, size)
+    candidate_files: List[Tuple[int, str, str, int]] = [] # (hash, symbolic_path, path relative to location, size)
+    # Size-limited moves select directory by directory
+    candidates_by_dir: Optional[Dict[str, List[Tuple[int, str, str, int]]]] = (
+        defaultdict(list) if size_limit_gb is not None else None)
     total_source_size = 0
     logger.debug("Identifying candidate files...")
 
@@ -66,28 +163,27 @@ def move_data(
     if specific_folders:
         normalized_folders = [folder.strip('/') for folder in specific_folders]
         logger.info(f"Filtering by specific folders: {normalized_folders}")
+        # A file is selected if it is one of the folders or lies beneath one
+        folder_prefixes = tuple(folder + '/' for folder in normalized_folders)
+        folder_exact = frozenset(normalized_folders)
 
     for hash_val, (symbolic_path, size) in dataset.index.file_info_by_hash.items():
-        try:
-            file_location_name = symbolic_path.split('/', 1)[0]
-        except IndexError:
+        file_location_name, sep, rel_path_in_loc = symbolic_path.partition('/')
+        if not sep:
             logger.warning(f"Skipping file with invalid symbolic path format: {symbolic_path}")
             continue
+        if file_location_name != source_location_name:
+            continue
 
-        if file_location_name == source_location_name:
-            total_source_size += size
-            # Check against specific folders if provided
-            if normalized_folders:
-                try:
-                    rel_path_in_loc = symbolic_path.split('/', 1)[1]
-                    if not any(rel_path_in_loc.startswith(folder + '/') or rel_path_in_loc == folder
-                               for folder in normalized_folders):
-                        continue # Skip if not in specified folders
-                except IndexError:
-                    # Should not happen if split worked before, but handle defensively
-                    logger.warning(f"Could not extract relative path from: {symbolic_path}")
-                    continue
-            candidate_files.append((hash_val, symbolic_path, size))
+        total_source_size += size
+        # Check against specific folders if provided
+        if normalized_folders:
+            if not (rel_path_in_loc.startswith(folder_prefixes) or rel_path_in_loc in folder_exact):
+                continue # Skip if not in specified folders
+        file_entry = (hash_val, symbolic_path, rel_path_in_loc, size)
+        candidate_files.append(file_entry)
+        if candidates_by_dir is not None:
+            candidates_by_dir[rel_path_in_loc.rpartition('/')[0]].append(file_entry)
 
     logger.info(f"Found {len(candidate_files)} candidate files in '{source_location_name}' (Total size: {format_size(total_source_size)}).")
     if not candidate_files:
@@ -95,26 +191,35 @@ def move_data(
         return {"moved_files": 0, "failed_files": 0, "skipped_files": 0, "total_bytes_moved": 0, "target_size_gb": 0}
 
     # --- 2. Apply size limit ---
-    files_to_process_info: List[Tuple[int, str, int]] = []
+    files_to_process_info: List[Tuple[int, str, str, int]] = []
     target_size_bytes = 0
     if size_limit_gb is not None:
         size_limit_bytes = size_limit_gb * (1024**3)
         logger.info(f"Applying size limit: {size_limit_gb:.2f} GB ({format_size(size_limit_bytes)})")
         current_size = 0
-        # Sort by path to implicitly group artists/albums together somewhat
-        candidate_files.sort(key=lambda x: x[1])
-        for hash_val, symbolic_path, size in candidate_files:
-            if current_size + size <= size_limit_bytes:
-                files_to_process_info.append((hash_val, symbolic_path, size))
+        # Take whole directories in path order so each directory's files are
+        # selected and read together; only the directory that crosses the limit
+        # is sorted, to take its files up to the limit
+        for directory in sorted(candidates_by_dir):
+            dir_files = candidates_by_dir[directory]
+            dir_size = sum(file_entry[3] for file_entry in dir_files)
+            if current_size + dir_size <= size_limit_bytes:
+                files_to_process_info.extend(dir_files)
+                current_size += dir_size
+                continue
+            for file_entry in sorted(dir_files, key=lambda x: x[2]):
+                size = file_entry[3]
+                if current_size + size > size_limit_bytes:
+                    break
+                files_to_process_info.append(file_entry)
                 current_size += size
-            else:
-                # Stop adding once limit is reached or exceeded by the next file
-                break
+            # Stop adding once limit is reached or exceeded by the next file
+            break
         target_size_bytes = current_size
         logger.info(f"Selected {len(files_to_process_info)} files to meet size limit (Actual size: {format_size(target_size_bytes)}).")
     else:
         files_to_process_info = candidate_files
-        target_size_bytes = sum(size for _, _, size in files_to_process_info)
+        target_size_bytes = sum(size for _, _, _, size in files_to_process_info)
         logger.info(f"No size limit applied. Processing all {len(files_to_process_info)} candidate files (Total size: {format_size(target_size_bytes)}).")
 
     if not files_to_process_info:
@@ -127,20 +232,20 @@ def move_data(
     current_state_files: Dict[int, str] = {}
 
     if not is_resuming:
-        initial_state_files = {hash_val: "pending" for hash_val, _, _ in files_to_process_info}
+        initial_state_files = {hash_val: "pending" for hash_val, _, _, _ in files_to_process_info}
         if not dry_run:
             state_file_path = operations.create_operation_state(
                 blackbird_dir=dataset.path / ".blackbird",
                 operation_type="move",
                 source=source_location_name,
                 target_location=target_location_name,
-                file_hashes=[h for h, _, _ in files_to_process_info]
+                file_hashes=[h for h, _, _, _ in files_to_process_info]
             )
             logger.info(f"Created operation state file: {state_file_path}")
             current_state_files = initial_state_files
         else:
             state_file_path = None # No state file for dry run
-            current_state_files = {hash_val: "skipped (dry run)" for hash_val, _, _ in files_to_process_info}
+            current_state_files = {hash_val: "skipped (dry run)" for hash_val, _, _, _ in files_to_process_info}
 
     else:
         # Resuming
@@ -155,7 +260,7 @@ def move_data(
         current_state_files = operation_state['files']
         # Filter files_to_process_info to only include those needing action
         hashes_in_state = set(current_state_files.keys())
-        original_hashes = {h for h, _, _ in files_to_process_info}
+        original_hashes = {h for h, _, _, _ in files_to_process_info}
 
         # Check consistency: ensure hashes in state match hashes calculated for the move parameters
         if hashes_in_state != original_hashes:
@@ -171,7 +276,8 @@ def move_data(
                           # Fetch info from index using hash from state
                            file_info = dataset.index.get_file_info_by_hash(hash_val_state)
                            if file_info:
-                               files_to_process_info_resuming.append((hash_val_state, file_info[0], file_info[1]))
+                               files_to_process_info_resuming.append(
+                                   (hash_val_state, file_info[0], file_info[0].partition('/')[2], file_info[1]))
                                processed_hashes.add(hash_val_state)
                            else:
                                logger.error(f"Hash {hash_val_state} from state file not found in current index. Cannot resume this file.")
@@ -191,8 +297,8 @@ def move_data(
         else:
              # Filter normally if hashes match
              files_to_process_info = [
-                 (h, p, s) for h, p, s in files_to_process_info
-                 if current_state_files.get(h, "pending") != "done"
+                 file_entry for file_entry in files_to_process_info
+                 if current_state_files.get(file_entry[0], "pending") != "done"
             ]
              logger.info(f"Found {len(files_to_process_info)} files pending or failed in state file.")
 
@@ -204,8 +310,8 @@ def move_data(
     total_bytes_moved = 0
 
     if dry_run:
-        for _, symbolic_path, size in files_to_process_info:
-             target_symbolic_path = target_location_name + '/' + symbolic_path.split('/', 1)[1]
+        for _, symbolic_path, relative_path, size in files_to_process_info:
+             target_symbolic_path = f"{target_location_name}/{relative_path}"
              logger.info(f"DRY RUN: Would move {symbolic_path} ({format_size(size)}) to {target_symbolic_path}")
              skipped_count += 1
         logger.info("Dry run complete.")
@@ -214,72 +320,112 @@ def move_data(
     total_files_to_move = len(files_to_process_info)
     logger.info(f"Starting actual move of {total_files_to_move} files...")
 
-    for i, (hash_val, source_symbolic_path, size) in enumerate(files_to_process_info):
-        progress = f"({i + 1}/{total_files_to_move})"
-        move_failed = False # Flag to break outer loop if needed
-        if current_state_files.get(hash_val) == "done": # Should have been filtered, but double check
-            logger.debug(f"{progress} Skipping already completed file: {source_symbolic_path}")
-            continue
-
-        try:
-            abs_source_path = dataset.resolve_path(source_symbolic_path)
-            # Construct target symbolic path
-            relative_path = source_symbolic_path.split('/', 1)[1]
-            target_symbolic_path = f"{target_location_name}/{relative_path}"
-            abs_target_path = dataset.resolve_path(target_symbolic_path)
-
-            # Ensure target directory exists
-            abs_target_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Perform the move
-            logger.debug(f"{progress} Moving {abs_source_path} -> {abs_target_path} ({format_size(size)})")
-            shutil.move(str(abs_source_path), str(abs_target_path))
-
-            # Update state to "done"
-            current_state_files[hash_val] = "done"
-            if state_file_path:
-                operations.update_operation_state_file(state_file_path, hash_val, "done")
-
-            moved_count += 1
-            total_bytes_moved += size
-
-        except SymbolicPathError as e:
-            error_msg = f"failed: Path resolution error: {e}"
-            logger.error(f"{progress} Failed to resolve path for {source_symbolic_path} or target: {e}")
-            current_state_files[hash_val] = error_msg
-            failed_count += 1
-            if state_file_path:
-                # Update state file immediately on failure
-                operations.update_operation_state_file(state_file_path, hash_val, error_msg)
-            move_failed = True
-            # Decide if we should continue or break on path error - let's continue for now
-            # break # Uncomment to stop on first path error
-        except (shutil.Error, OSError) as e:
-            error_msg = f"failed: {e}"
-            logger.error(f"{progress} Failed to move {source_symbolic_path}: {e}")
-            current_state_files[hash_val] = error_msg
-            failed_count += 1
-            if state_file_path:
-                # Update state file immediately on failure
-                operations.update_operation_state_file(state_file_path, hash_val, error_msg)
-            move_failed = True
-            # Decide if we should continue or break on move error - let's break
-            break # Stop the move process on the first actual move error
-        except Exception as e:
-            error_msg = f"failed: Unexpected error: {e}"
-            logger.exception(f"{progress} Unexpected error moving {source_symbolic_path}: {e}")
-            current_state_files[hash_val] = error_msg
-            failed_count += 1
-            if state_file_path:
-                # Update state file immediately on failure
-                operations.update_operation_state_file(state_file_path, hash_val, error_msg)
-            move_failed = True
-            # Decide if we should continue or break on unexpected error - let's break
-            break # Stop the move process on unexpected errors
-
-        # Removed the break condition here as we break within exception handlers now if needed
-        # if move_failed:
-        #     break
+    # State updates are buffered and written in batches rather than once per file
+    flusher = operations.OperationStateWriter(state_file_path)
+    max_workers = max(1, parallel)
+    in_flight: Dict[Future, Tuple[int, int, str, int]] = {} # future -> (position, hash, symbolic_path, size)
+    stop_submitting = False
+    # Most files share an album directory; create each target directory once
+    created_dirs = set()
+    # Locations don't change during the move, resolve against a specialized resolver
+    resolver = make_resolver(dataset.locations.get_all_location_strings())
+
+    # Log messages are only formatted when they are emitted
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+    def progress(i: int) -> str:
+        return f"({i + 1}/{total_files_to_move})"
+
+    def record_failure(hash_val: int, error_msg: str) -> None:
+        current_state_files[hash_val] = error_msg
+        # Update state file immediately on failure
+        flusher.mark(hash_val, error_msg)
+        flusher.flush()
+
+    try:
+        # Resolve every file's source and target up front, so the move loop
+        # only creates directories and hands out work
+        prepared: List[Tuple[int, int, str, int, str, str]] = [] # (position, hash, symbolic_path, size, source, target)
+        # Files already done were filtered out when the operation state was prepared
+        for i, (hash_val, source_symbolic_path, relative_path, size) in enumerate(files_to_process_info):
+            try:
+                abs_source_path = resolver(source_symbolic_path)
+                # Construct target symbolic path
+                abs_target_path = resolver(f"{target_location_name}/{relative_path}")
+            except SymbolicPathError as e:
+                logger.error(f"{progress(i)} Failed to resolve path for {source_symbolic_path} or target: {e}")
+                record_failure(hash_val, f"failed: Path resolution error: {e}")
+                failed_count += 1
+                # Decide if we should continue or break on path error - let's continue for now
+                continue
+            except Exception as e:
+                logger.exception(f"{progress(i)} Unexpected error moving {source_symbolic_path}: {e}")
+                record_failure(hash_val, f"failed: Unexpected error: {e}")
+                failed_count += 1
+                break # Stop the move process on unexpected errors; files before this one are still moved
+            prepared.append((i, hash_val, source_symbolic_path, size, abs_source_path, abs_target_path))
+        pending_files = iter(prepared)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                # Keep up to max_workers moves in flight
+                while not stop_submitting and len(in_flight) < max_workers:
+                    item = next(pending_files, None)
+                    if item is None:
+                        break
+                    i, hash_val, source_symbolic_path, size, abs_source_path, abs_target_path = item
+
+                    try:
+                        # Ensure target directory exists
+                        target_dir = os.path.dirname(abs_target_path)
+                        if target_dir not in created_dirs:
+                            os.makedirs(target_dir, exist_ok=True)
+                            created_dirs.add(target_dir)
+                    except OSError as e:
+                        logger.error(f"{progress(i)} Failed to move {source_symbolic_path}: {e}")
+                        record_failure(hash_val, f"failed: {e}")
+                        failed_count += 1
+                        stop_submitting = True # Stop the move process on the first actual move error
+                        break
+                    except Exception as e:
+                        logger.exception(f"{progress(i)} Unexpected error moving {source_symbolic_path}: {e}")
+                        record_failure(hash_val, f"failed: Unexpected error: {e}")
+                        failed_count += 1
+                        stop_submitting = True # Stop the move process on unexpected errors
+                        break
+
+                    if debug_enabled:
+                        logger.debug(f"{progress(i)} Moving {abs_source_path} -> {abs_target_path} ({format_size(size)})")
+                    future = executor.submit(_move_file, abs_source_path, abs_target_path, size)
+                    in_flight[future] = (i, hash_val, source_symbolic_path, size)
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, hash_val, source_symbolic_path, size = in_flight.pop(future)
+                    try:
+                        future.result()
+                    except (shutil.Error, OSError) as e:
+                        logger.error(f"{progress(i)} Failed to move {source_symbolic_path}: {e}")
+                        record_failure(hash_val, f"failed: {e}")
+                        failed_count += 1
+                        # Stop the move process on the first actual move error;
+                        # moves already in flight are allowed to finish
+                        stop_submitting = True
+                    except Exception as e:
+                        logger.exception(f"{progress(i)} Unexpected error moving {source_symbolic_path}: {e}")
+                        record_failure(hash_val, f"failed: Unexpected error: {e}")
+                        failed_count += 1
+                        stop_submitting = True # Stop the move process on unexpected errors
+                    else:
+                        current_state_files[hash_val] = "done"
+                        flusher.mark(hash_val, "done")
+                        moved_count += 1
+                        total_bytes_moved += size
+    finally:
+        flusher.close()
 
     # --- 5. Finalize and Report ---
     logger.info("Move operation loop finished.")
@@ -291,7 +437,7 @@ def move_data(
         "state_file_path": state_file_path if not dry_run else None, # Explicitly add state file path
         # Add keys potentially used by CLI:
         "identified_files": len(candidate_files), # Or maybe len(files_to_process_info) before filtering?
-        "files_to_move": {h: (p, s) for h, p, s in files_to_process_info}, # Maybe needed?
+        "files_to_move": {h: (p, s) for h, p, _, s in files_to_process_info}, # Maybe needed?
         "total_bytes_to_move": target_size_bytes # Add this for dry run consistency
     }
 
@@ -299,7 +445,7 @@ def move_data(
         # Determine the correct condition for deletion: all attempted files are done.
         all_attempted_done = True
         if files_to_process_info: # Check if any files were meant to be processed
-            for h, _, _ in files_to_process_info:
+            for h, _, _, _ in files_to_process_info:
                  if current_state_files.get(h) != "done":
                       all_attempted_done = False
                       break
@@ -312,10 +458,12 @@ def move_data(
             logger.info("All files moved successfully or none needed moving. Deleting state file.")
             operations.delete_operation_state(state_file_path)
         elif failed_count > 0:
+            operations.compact_operation_state(state_file_path)
             logger.warning(f"{failed_count} file(s) failed to move. State file kept at: {state_file_path}. Use 'resume' command to retry.")
         else: # Moved some, but not all (maybe interrupted before starting or filtered?) or maybe no files were selected
              # Check if the state file actually exists before logging about keeping it
              if state_file_path.exists():
+                operations.compact_operation_state(state_file_path)
                 logger.info(f"Move operation did not process all potential files or encountered no failures but wasn't fully complete. State file kept at {state_file_path}")
              else:
                   logger.info("Move operation finished; state file was not created or already deleted.")
@@ -1,12 +1,36 @@
+import contextlib
 import json
+import os
 import time
 import logging
+import mmap
+import threading
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, TypedDict, Union
+from typing import IO, Any, Dict, List, Literal, Optional, TypedDict, Union
+
+from .utils import atomic_write_bytes
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; state updates are then unlocked
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
 OPERATION_STATE_FILENAME_PREFIX = "operation"
+OPERATION_LOG_BUFFER_SIZE = 1 << 16
+
+# Batching of per-file status updates by OperationStateWriter
+STATE_FLUSH_BATCH = 128
+STATE_FLUSH_MIN_BATCH = 16
+STATE_FLUSH_MAX_BATCH = 4096
+STATE_FLUSH_INTERVAL = 2.0  # seconds
 
 OperationStatus = Union[Literal["pending", "done"], str]  # Use str for "failed: <reason>"
 
@@ -18,12 +42,81 @@ class OperationState(TypedDict):
     components: Optional[List[str]] # Only for sync
     files: Dict[int, OperationStatus] # file_hash -> status
 
+# On disk the files map is stored as two parallel arrays under these keys,
+# which parse straight into int hashes without a per-key cast
+STATE_HASHES_KEY = "hashes"
+STATE_STATUSES_KEY = "statuses"
+
 
 def get_state_file_path(blackbird_dir: Path, operation_type: str, timestamp: float) -> Path:
     """Generates the path for an operation state file."""
     filename = f"{OPERATION_STATE_FILENAME_PREFIX}_{operation_type}_{timestamp:.0f}.json"
     return blackbird_dir / filename
 
+def get_state_log_path(state_file_path: Path) -> Path:
+    """Returns the path of the append-only update log next to a state file."""
+    return state_file_path.with_suffix(".log")
+
+def get_state_lock_path(state_file_path: Path) -> Path:
+    """Returns the path of the lock file that guards updates to a state file."""
+    return state_file_path.with_suffix(".lock")
+
+@contextlib.contextmanager
+def _state_lock(state_file_path: Path):
+    """Holds an exclusive ``flock`` on a state file's lock file while the block runs.
+
+    Serializes log appends, rewrites and compaction of one state file across
+    processes and threads (each holder opens its own descriptor). Does
+    nothing where ``fcntl`` is unavailable.
+    """
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(get_state_lock_path(state_file_path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd) # Closing the descriptor releases the lock
+
+def _encode_state(state: Dict[str, Any]) -> bytes:
+    """Serializes a state dict to compact JSON with the files map split into parallel arrays."""
+    payload = {k: v for k, v in state.items() if k != "files"}
+    files = state["files"]
+    payload[STATE_HASHES_KEY] = list(files)
+    payload[STATE_STATUSES_KEY] = list(files.values())
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def _decode_files(state: Dict[str, Any]) -> Dict[int, OperationStatus]:
+    """Rebuilds the files map from the parallel arrays, or from a ``files`` object in older state files."""
+    if "files" in state:
+        return {int(k): v for k, v in state["files"].items()}
+    hashes = state.pop(STATE_HASHES_KEY)
+    statuses = state.pop(STATE_STATUSES_KEY)
+    if len(hashes) != len(statuses):
+        raise ValueError("Invalid state file format: hashes and statuses differ in length.")
+    return dict(zip(hashes, statuses))
+
+def _decode_json(raw: Union[bytes, str]) -> Any:
+    """Parses JSON with orjson when available; errors are ``json.JSONDecodeError`` either way."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _decode_json_file(f: IO[bytes]) -> Any:
+    """Parses an open JSON file.
+
+    With orjson the file is parsed straight from a read-only memory map,
+    without first copying its contents into a ``bytes`` object.
+    """
+    if not ORJSON_AVAILABLE:
+        return json.loads(f.read())
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            return orjson.loads(view)
+
 def create_operation_state(
     blackbird_dir: Path,
     operation_type: Literal["sync", "move"],
@@ -46,8 +139,7 @@ def create_operation_state(
     }
     
     try:
-        with open(state_file_path, "w") as f:
-            json.dump(state, f, indent=2)
+        atomic_write_bytes(state_file_path, _encode_state(state))
         logger.info(f"Created operation state file: {state_file_path}")
         return state_file_path
     except IOError as e:
@@ -60,54 +152,209 @@ def load_operation_state(state_file_path: Path) -> Optional[OperationState]:
         logger.warning(f"Operation state file not found: {state_file_path}")
         return None
     try:
-        with open(state_file_path, "r") as f:
-            state = json.load(f)
+        with open(state_file_path, "rb") as f:
+            state = _decode_json_file(f)
             # Basic validation (can be expanded)
-            if not all(k in state for k in ["operation_type", "timestamp", "source", "target_location", "files"]):
+            if not all(k in state for k in ["operation_type", "timestamp", "source", "target_location"]) or \
+               not ("files" in state or (STATE_HASHES_KEY in state and STATE_STATUSES_KEY in state)):
                  raise ValueError("Invalid state file format.")
-            # Cast files keys back to int
-            state["files"] = {int(k): v for k, v in state["files"].items()}
-            return state # type: ignore # Trusting basic validation for now
+            state["files"] = _decode_files(state)
+        _replay_operation_log(get_state_log_path(state_file_path), state["files"])
+        return state # type: ignore # Trusting basic validation for now
     except (IOError, json.JSONDecodeError, ValueError) as e:
         logger.error(f"Failed to load or parse operation state file {state_file_path}: {e}")
         return None # Treat load failure as non-resumable
 
+def _replay_operation_log(log_path: Path, files: Dict[int, OperationStatus]) -> None:
+    """Overlays the statuses recorded in an update log onto ``files``.
+
+    A line that cannot be parsed (e.g. one cut short by a crash) is skipped.
+    """
+    try:
+        with open(log_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = _decode_json(line)
+                    files[int(entry["h"])] = entry["s"]
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                    logger.warning(f"Skipping malformed entry in operation log {log_path}: {line.strip()!r}")
+    except FileNotFoundError:
+        pass
+
+def _remove_operation_log(state_file_path: Path) -> None:
+    """Removes the update log of a state file if there is one."""
+    try:
+        os.remove(get_state_log_path(state_file_path))
+    except FileNotFoundError:
+        pass
+
+def open_operation_log(state_file_path: Path) -> IO[str]:
+    """Opens the update log of a state file for appending.
+
+    The handle is buffered; callers should flush it after each batch of
+    updates written with ``append_operation_log``.
+    """
+    return open(get_state_log_path(state_file_path), "a", buffering=OPERATION_LOG_BUFFER_SIZE)
+
+def append_operation_log(log_file: IO[str], updates: Dict[int, OperationStatus]) -> None:
+    """Appends status updates to an open update log, one JSON line per file."""
+    log_file.write("".join(
+        f'{{"h":{file_hash},"s":{json.dumps(status)}}}\n' for file_hash, status in updates.items()
+    ))
+
+class OperationStateWriter:
+    """Buffers per-file status updates and writes them to the state file in batches.
+
+    A batch is written once it holds ``batch_size`` updates or ``interval``
+    seconds have passed since the last write. The batch size adapts to the
+    update rate: it doubles when a batch fills well within the interval and
+    halves when the timer fires first, so a crash loses at most a few
+    seconds of progress. Updates go to the state file's append-only log,
+    which ``load_operation_state`` merges back. Each batch is appended
+    under the state file lock, so writers in several processes can share
+    a state file, and one writer is safe to share between worker threads.
+    Does nothing when there is no state file.
+
+    Usage::
+
+        with OperationStateWriter(state_file_path) as writer:
+            writer.mark(file_hash, "done")
+    """
+
+    def __init__(self, state_file_path: Optional[Path],
+                 batch_size: int = STATE_FLUSH_BATCH,
+                 interval: float = STATE_FLUSH_INTERVAL):
+        self.state_file_path = state_file_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending_updates: Dict[int, OperationStatus] = {}
+        self.last_flush_ts = time.monotonic()
+        self.flush_count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "OperationStateWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def mark(self, file_hash: int, status: OperationStatus) -> None:
+        """Queues a status update, flushing if the batch is full or stale."""
+        if self.state_file_path is None:
+            return
+        with self._lock:
+            self.pending_updates[file_hash] = status
+            elapsed = time.monotonic() - self.last_flush_ts
+            if len(self.pending_updates) >= self.batch_size:
+                if elapsed < self.interval / 4:
+                    self.batch_size = min(self.batch_size * 2, STATE_FLUSH_MAX_BATCH)
+                self._flush()
+            elif elapsed > self.interval:
+                self.batch_size = max(self.batch_size // 2, STATE_FLUSH_MIN_BATCH)
+                self._flush()
+
+    def flush(self) -> None:
+        """Appends all pending updates to the state log."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.pending_updates and self.state_file_path is not None:
+            # Reopened per batch: a compaction elsewhere may have replaced the log
+            with _state_lock(self.state_file_path), open_operation_log(self.state_file_path) as log_file:
+                append_operation_log(log_file, self.pending_updates)
+            self.pending_updates = {}
+            self.flush_count += 1
+        self.last_flush_ts = time.monotonic()
+
+    def close(self) -> None:
+        """Flushes pending updates."""
+        self.flush()
+
+def compact_operation_state(state_file_path: Path) -> None:
+    """Merges the update log into the state file and removes the log."""
+    log_path = get_state_log_path(state_file_path)
+    if not log_path.exists():
+        return
+    try:
+        with _state_lock(state_file_path):
+            state = load_operation_state(state_file_path)
+            if not state:
+                return
+            write_operation_state(state_file_path, state)
+    except OSError as e:
+        logger.error(f"Failed to compact operation state file {state_file_path}: {e}")
+
+def write_operation_state(state_file_path: Path, state: OperationState) -> None:
+    """Writes a full snapshot of an in-memory state to its state file.
+
+    The snapshot supersedes the update log, which is removed, so ``state``
+    must be current: loaded with ``load_operation_state`` (which replays the
+    log) and updated in memory since. Callers sharing the state file with
+    other writers should hold its lock from loading through writing.
+
+    Raises:
+        OSError: If the state file cannot be written.
+    """
+    atomic_write_bytes(state_file_path, _encode_state(state))
+    _remove_operation_log(state_file_path)
+
 def update_operation_state_file(
     state_file_path: Path,
     file_hash: int,
     status: OperationStatus,
 ):
     """Updates the status of a single file hash in the state file."""
-    # This is not atomic but should be sufficient for now.
-    # For higher concurrency, locking or transactional updates might be needed.
+    update_operation_state_bulk(state_file_path, {file_hash: status})
+
+
+def update_operation_state_bulk(
+    state_file_path: Path,
+    updates: Dict[int, OperationStatus],
+):
+    """Applies several status updates with a single read-modify-write of the state file.
+
+    Hashes that are not part of the state file are skipped with a warning.
+
+    Args:
+        state_file_path: Path to the operation state file.
+        updates: Mapping of file hash to its new status.
+    """
+    if not updates:
+        return
+    # The read-modify-write runs under the state file lock, so concurrent
+    # workers and OperationStateWriter appends can't interleave with it
     try:
-        current_state = load_operation_state(state_file_path)
-        if not current_state:
-            # Logged in load_operation_state
-            return
+        with _state_lock(state_file_path):
+            current_state = load_operation_state(state_file_path)
+            if not current_state:
+                # Logged in load_operation_state
+                return
 
-        if file_hash not in current_state["files"]:
-            logger.warning(f"File hash {file_hash} not found in state file {state_file_path}. Skipping update.")
-            return
+            files = current_state["files"]
+            for file_hash, status in updates.items():
+                if file_hash not in files:
+                    logger.warning(f"File hash {file_hash} not found in state file {state_file_path}. Skipping update.")
+                    continue
+                files[file_hash] = status
 
-        current_state["files"][file_hash] = status
+            # Rewrite the file; the snapshot includes everything the update log recorded
+            write_operation_state(state_file_path, current_state)
 
-        # Rewrite the file
-        with open(state_file_path, "w") as f:
-            # Convert keys back to string for JSON
-            state_to_save = current_state.copy()
-            state_to_save["files"] = {str(k): v for k, v in current_state["files"].items()}
-            json.dump(state_to_save, f, indent=2)
-            
     except (IOError, json.JSONDecodeError) as e:
-        logger.error(f"Failed to update operation state file {state_file_path} for hash {file_hash}: {e}")
+        logger.error(f"Failed to update operation state file {state_file_path} ({len(updates)} update(s)): {e}")
     except Exception as e:
-        logger.exception(f"Unexpected error updating state file {state_file_path} for hash {file_hash}: {e}")
+        logger.exception(f"Unexpected error updating state file {state_file_path} ({len(updates)} update(s)): {e}")
 
 
 def delete_operation_state(state_file_path: Path):
-    """Deletes the operation state file."""
+    """Deletes the operation state file, its update log and its lock file."""
     try:
+        _remove_operation_log(state_file_path)
+        try:
+            os.remove(get_state_lock_path(state_file_path))
+        except FileNotFoundError:
+            pass
         if state_file_path.exists():
             state_file_path.unlink()
             logger.info(f"Deleted operation state file: {state_file_path}")
@@ -118,12 +365,17 @@ def delete_operation_state(state_file_path: Path):
 
 def find_latest_state_file(blackbird_dir: Path, operation_type: Literal["sync", "move"]) -> Optional[Path]:
     """Finds the most recent state file for a given operation type."""
-    pattern = f"{OPERATION_STATE_FILENAME_PREFIX}_{operation_type}_*.json"
-    state_files = sorted(
-        blackbird_dir.glob(pattern),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True
-    )
-    if state_files:
-        return state_files[0]
-    return None 
\ No newline at end of file
+    prefix = f"{OPERATION_STATE_FILENAME_PREFIX}_{operation_type}_"
+    latest_path = None
+    latest_mtime = None
+    try:
+        with os.scandir(blackbird_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith(prefix) and entry.name.endswith(".json")):
+                    continue
+                mtime = entry.stat().st_mtime
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest_path, latest_mtime = entry.path, mtime
+    except FileNotFoundError:
+        return None
+    return Path(latest_path) if latest_path is not None else None
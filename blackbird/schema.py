@@ -1,16 +1,135 @@
 from pathlib import Path
 import json
-from typing import Dict, Any, List, Optional, Union, Tuple, Set
+from typing import Callable, Dict, Any, FrozenSet, Iterable, Iterator, List, Optional, Union, Tuple, Set
 from dataclasses import dataclass
 import fnmatch
+import functools
+import itertools
 import pickle
 import os
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import re
+import time
 import logging
 
+from .utils import atomic_write_bytes
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Directory listings kept by find_companion_files, least recently used evicted first
+DIR_NAMES_CACHE_SIZE = 1024
+# Listings of directories modified less than this long ago are not cached: a
+# change within the filesystem's timestamp granularity (2 s on FAT, similar on
+# some NFS servers) would leave the directory mtime unchanged
+DIR_NAMES_RACY_WINDOW_NS = 2_000_000_000
+
+# Numbered section postfix: a component name, its number, then the extension
+_SECTION_POSTFIX_RE = re.compile(r"(_.+?)(\d+)([.][^.]+)$")
+
+
+@functools.lru_cache(maxsize=64)
+def _component_suffixes(patterns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Returns the track-name suffixes of '*'-prefixed component patterns, in schema order.
+
+    For example ``*_instrumental.mp3`` gives ``_instrumental`` and
+    ``*.mir.json`` gives ``.mir``.
+    """
+    suffixes = []
+    for pattern in patterns:
+        pattern_base = Path(pattern).stem
+        if pattern_base.startswith("*"):
+            suffixes.append(pattern_base[1:])
+    return tuple(suffixes)
+
+
+@functools.lru_cache(maxsize=64)
+def _component_classifier(patterns: Tuple[str, ...]) -> Callable[[str], Optional[int]]:
+    """Compiles component glob patterns into one regex that classifies a file name in a single match.
+
+    The returned function takes ``os.path.normcase(filename)`` and returns the
+    index of the first pattern that ``fnmatch.fnmatch`` would accept, or None.
+    Each pattern is one named alternative; alternatives are tried in schema
+    order and are anchored at the end, so the first full match wins. Names
+    rather than group numbers identify the alternative because
+    ``fnmatch.translate`` adds its own groups on Python < 3.11.
+    """
+    if not patterns:
+        return lambda name: None
+    match = re.compile("|".join(
+        f"(?P<c{i}>{fnmatch.translate(os.path.normcase(pattern))})" for i, pattern in enumerate(patterns)
+    )).match
+    indices = {f"c{i}": i for i in range(len(patterns))}
+
+    def classify(name: str) -> Optional[int]:
+        m = match(name)
+        return indices[m.lastgroup] if m else None
+    return classify
+
+
+def _scan_directory(directory: str) -> Tuple[List[os.DirEntry], List[str]]:
+    """Lists the regular files in ``directory`` and the subdirectories a walk should descend into.
+
+    .blackbird directories and symlinked directories are left out; an
+    unreadable directory gives two empty lists.
+    """
+    files, subdirs = [], []
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return files, subdirs
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name != '.blackbird':
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                files.append(entry)
+        except OSError:
+            continue
+    return files, subdirs
+
+
+def _walk_files(root: str) -> Iterator[os.DirEntry]:
+    """Yields a ``DirEntry`` for every regular file under ``root``, walking with ``os.scandir``.
+
+    Avoids the per-entry Path objects and stat calls of ``Path.rglob``. Like
+    the index scan, .blackbird directories are skipped and symlinked
+    directories are not followed; unreadable directories are skipped.
+    """
+    pending_dirs = [root]
+    while pending_dirs:
+        files, subdirs = _scan_directory(pending_dirs.pop())
+        pending_dirs.extend(subdirs)
+        yield from files
+
+
+def _collect_by_subtree(root: str, collect: Callable[[Iterable[os.DirEntry]], Any]) -> List[Any]:
+    """Applies ``collect`` to the files under ``root``, walking top-level subdirectories concurrently.
+
+    Walks are I/O bound, so overlapping them hides directory read latency
+    on slow or network storage. The files directly in ``root`` form the
+    first batch and each top-level subdirectory another; with fewer than
+    two subdirectories everything is collected in one batch.
+
+    Returns:
+        List of ``collect`` results, one per batch
+    """
+    top_files, subdirs = _scan_directory(root)
+    if len(subdirs) < 2:
+        return [collect(itertools.chain(top_files, *(_walk_files(subdir) for subdir in subdirs)))]
+    with ThreadPoolExecutor(max_workers=min(8, len(subdirs))) as executor:
+        subtree_results = list(executor.map(lambda subdir: collect(_walk_files(subdir)), subdirs))
+    return [collect(top_files)] + subtree_results
+
+
 class SchemaDiscoveryResult:
     """Result of schema discovery."""
 
@@ -64,6 +183,8 @@ class DatasetComponentSchema:
         self.path = Path(path)
         self.schema_path = self.path / ".blackbird" / "schema.json"
         self.schema = self._load_schema()
+        # directory -> (mtime_ns, entry names), see _directory_names
+        self._dir_names_cache: 'OrderedDict[str, Tuple[int, FrozenSet[str]]]' = OrderedDict()
 
     @classmethod
     def create(cls, dataset_path: Path) -> 'DatasetComponentSchema':
@@ -83,8 +204,11 @@ class DatasetComponentSchema:
     def save(self) -> None:
         """Save schema to file."""
         self.schema_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.schema_path, 'w', encoding='utf-8') as f:
-            json.dump(self.schema, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(self.schema, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(self.schema, indent=2, ensure_ascii=False).encode('utf-8')
+        atomic_write_bytes(self.schema_path, payload)
         logger.info(f"Schema saved to {self.schema_path}")
 
     def validate(self) -> ValidationResult:
@@ -111,18 +235,16 @@ class DatasetComponentSchema:
                 return result  # Return early if we find a collision
             seen_patterns[pattern] = comp_name
         
-        # Check directory structure
-        for root, _, files in os.walk(self.path):
+        # Check directory structure in a single walk, never descending into .blackbird
+        for root, dirs, files in os.walk(self.path):
+            if '.blackbird' in dirs:
+                dirs.remove('.blackbird')
             try:
                 rel_path = Path(root).relative_to(self.path)
             except ValueError:
                 continue  # Skip root directory
                 
             parts = rel_path.parts
-            
-            # Skip .blackbird directory
-            if '.blackbird' in parts:
-                continue
                 
             # Validate directory structure
             if len(parts) > 0:
@@ -158,7 +280,7 @@ class DatasetComponentSchema:
         Returns:
             SchemaDiscoveryResult indicating success and containing any errors
         """
-        print(f"\nStarting discover_schema with folders: {folders}")
+        logger.debug(f"Starting discover_schema with folders: {folders}")
         
         # Reset schema for discovery
         self.schema = {
@@ -173,14 +295,22 @@ class DatasetComponentSchema:
             all_base_names = set()
             all_unmatched = set()
             
+            folder_paths = []
             for folder in folders:
                 folder_path = self.path / folder
                 if not folder_path.exists():
-                    print(f"Warning: Folder {folder_path} does not exist")
+                    logger.warning(f"Folder {folder_path} does not exist")
                     continue
-                    
-                postfix_groups, base_names, unmatched = self._analyze_file_patterns_in_directory(str(folder_path))
-                
+                folder_paths.append(str(folder_path))
+
+            # Folder walks are I/O bound, so overlap them on slow or network storage
+            if len(folder_paths) > 1:
+                with ThreadPoolExecutor(max_workers=min(8, len(folder_paths))) as executor:
+                    folder_results = list(executor.map(self._analyze_file_patterns_in_directory, folder_paths))
+            else:
+                folder_results = [self._analyze_file_patterns_in_directory(p) for p in folder_paths]
+
+            for postfix_groups, base_names, unmatched in folder_results:
                 # Merge results
                 for postfix, tracks in postfix_groups.items():
                     for base_name, files in tracks.items():
@@ -189,7 +319,7 @@ class DatasetComponentSchema:
                 all_unmatched.update(unmatched)
         else:
             # Analyze entire dataset
-            all_postfix_groups, all_base_names, all_unmatched = self._analyze_file_patterns_in_directory(str(self.path))
+            all_postfix_groups, all_base_names, all_unmatched = self._analyze_file_patterns_in_directory(str(self.path), parallel=True)
 
         # Prepare stats for the result
         stats = {
@@ -237,21 +367,20 @@ class DatasetComponentSchema:
                 "description": ""  # Empty description by default
             }
 
-            # Calculate track coverage using full paths
-            track_paths = {file 
-                         for base_name, files in tracks.items() 
-                         for file in files}
-            all_track_paths = {file 
-                             for base_name in all_base_names 
-                             for file in all_postfix_groups[postfix][base_name]}
-            
-            total_tracks = len(all_track_paths)
+            # Calculate track coverage using full paths, counting files
+            # (multiple-file components included) in the same pass
+            track_paths = set()
+            total_files = 0
+            for files in tracks.values():
+                track_paths.update(files)
+                total_files += len(files)
+
+            # Every base name grouped under this postfix is one of all_base_names,
+            # so the paths over all base names are exactly track_paths
             tracks_with_component = len(track_paths)
+            total_tracks = tracks_with_component
             track_coverage = tracks_with_component / total_tracks if total_tracks > 0 else 0.0
 
-            # Count total files, handling multiple-file components correctly
-            total_files = sum(len(files) for files in tracks.values())
-
             # Add component stats
             stats["components"][component_name] = {
                 "pattern": pattern,
@@ -281,8 +410,9 @@ class DatasetComponentSchema:
             return filename[:-9]  # Remove .mir.json
 
         # Get everything before first underscore or last dot
-        if '_' in filename:
-            return filename.split('_')[0]
+        base, underscore, _ = filename.partition('_')
+        if underscore:
+            return base
         return filename.rsplit('.', 1)[0]
 
     def _extract_postfix(self, filename: str, base_name: str) -> Tuple[str, bool]:
@@ -301,14 +431,37 @@ class DatasetComponentSchema:
         postfix = filename[len(base_name):]
         
         # Check for numbered section pattern - look for numbers before the extension
-        section_match = re.search(r"(_.+?)(\d+)([.][^.]+)$", postfix)
+        section_match = _SECTION_POSTFIX_RE.search(postfix)
         if section_match:
             return (postfix, True)
         
         # Return the full postfix (includes leading underscore if present)
         return (postfix, False)
 
-    def _analyze_file_patterns_in_directory(self, directory_path: str) -> Tuple[Dict[str, Dict[str, Set[str]]], Set[str], Set[str]]:
+    def _group_files_by_base_name(self, entries: Iterable[os.DirEntry], prefix_len: int) -> Tuple[Set[str], Dict[str, Set[str]]]:
+        """Group walked files by their potential base names.
+
+        Args:
+            entries: File entries, as yielded by ``_walk_files``
+            prefix_len: Length of the analyzed directory prefix to strip from each path
+
+        Returns:
+            Tuple of:
+            - Set of relative paths of files without a base name
+            - Dict mapping base names to sets of relative file paths
+        """
+        unmatched_files = set()
+        base_name_files = defaultdict(set)
+        for entry in entries:
+            file_path = entry.path[prefix_len:]
+            base = self._find_base_name(entry.name)
+            if base:
+                base_name_files[base].add(file_path)
+            else:
+                unmatched_files.add(file_path)
+        return unmatched_files, base_name_files
+
+    def _analyze_file_patterns_in_directory(self, directory_path: str, parallel: bool = False) -> Tuple[Dict[str, Dict[str, Set[str]]], Set[str], Set[str]]:
         """Analyze files in a directory to discover components.
         
         Examines all files in the directory and its subdirectories to identify:
@@ -319,6 +472,8 @@ class DatasetComponentSchema:
         
         Args:
             directory_path: Path to directory to analyze
+            parallel: Walk the top-level subdirectories concurrently, which
+                overlaps directory reads on slow or network storage
             
         Returns:
             Tuple of:
@@ -330,63 +485,47 @@ class DatasetComponentSchema:
         if not path.exists() or not path.is_dir():
             return defaultdict(lambda: defaultdict(set)), set(), set()
 
-        # Collect all files with their relative paths
-        all_files = set()
-        for file_path in path.rglob('*'):
-            if file_path.is_file() and '.blackbird' not in str(file_path):
-                rel_path = str(file_path.relative_to(path))
-                all_files.add(rel_path)
-
-        # Group files by potential base names
-        base_name_files = defaultdict(set)
-        for file_path in all_files:
-            file_name = os.path.basename(file_path)
-            base = self._find_base_name(file_name)
-            if base:
-                base_name_files[base].add(file_path)
+        # Stream the walk, grouping relative file paths by potential base
+        # names and keeping files without one as unmatched
+        root = str(path)
+        prefix_len = len(os.path.join(root, ''))
+        if parallel:
+            # Each worker walks and groups its own subtree; results are merged afterwards
+            groups = _collect_by_subtree(root, lambda entries: self._group_files_by_base_name(entries, prefix_len))
+            unmatched_files, base_name_files = groups[0]
+            for subtree_unmatched, subtree_base_names in groups[1:]:
+                unmatched_files.update(subtree_unmatched)
+                for base, files in subtree_base_names.items():
+                    base_name_files[base].update(files)
+        else:
+            unmatched_files, base_name_files = self._group_files_by_base_name(_walk_files(root), prefix_len)
 
         # Analyze postfixes for each base name
         postfix_groups = defaultdict(lambda: defaultdict(set))
-        unmatched_files = set(all_files)
         base_names = set()
 
         for base_name, files in base_name_files.items():
             # Verify all files in this group have filenames starting with base_name
             if not all(os.path.basename(f).startswith(base_name) for f in files):
+                unmatched_files.update(files)
                 continue
 
             base_names.add(base_name)
 
-            # First pass: identify numbered components and their base patterns
-            numbered_patterns = {}  # base pattern -> set of numbered files
+            # Group files by postfix in a single pass; numbered section files are
+            # grouped under their base pattern with the number replaced by *
             for file_path in files:
-                file_name = os.path.basename(file_path)
-                postfix, is_numbered = self._extract_postfix(file_name, base_name)
-                if is_numbered:
+                # Remove base name to get the postfix part, as _extract_postfix
+                # does, keeping the section match to build the base pattern
+                postfix = os.path.basename(file_path)[len(base_name):]
+                section_match = _SECTION_POSTFIX_RE.search(postfix)
+                if section_match:
                     # Extract base pattern by removing the number
-                    section_match = re.search(r"(_.+?)(\d+)([.][^.]+)$", postfix)
-                    if section_match:
-                        base_pattern = section_match.group(1) + '*' + section_match.group(3)
-                        if base_pattern not in numbered_patterns:
-                            numbered_patterns[base_pattern] = set()
-                        numbered_patterns[base_pattern].add(file_path)
-
-            # Second pass: group files by postfix
-            for file_path in files:
-                file_name = os.path.basename(file_path)
-                postfix, is_numbered = self._extract_postfix(file_name, base_name)
-                
-                if is_numbered:
-                    # For numbered files, use the base pattern
-                    section_match = re.search(r"(_.+?)(\d+)([.][^.]+)$", postfix)
-                    if section_match:
-                        base_pattern = section_match.group(1) + '*' + section_match.group(3)
-                        postfix_groups[base_pattern][base_name].update(numbered_patterns[base_pattern])
+                    base_pattern = section_match.group(1) + '*' + section_match.group(3)
+                    postfix_groups[base_pattern][base_name].add(file_path)
                 else:
                     # For regular files, use the exact postfix
                     postfix_groups[postfix][base_name].add(file_path)
-                
-                unmatched_files.discard(file_path)
 
         return postfix_groups, base_names, unmatched_files
 
@@ -400,19 +539,65 @@ class DatasetComponentSchema:
             List of companion file paths
         """
         companions = []
-        base_path = self.get_track_relative_path(file_path)
+        track_base = self.path / self.get_track_relative_path(file_path)
+        track_dir = track_base.parent
+        sibling_names = self._directory_names(track_dir)
         
         # Check each component pattern
         for comp_info in self.schema["components"].values():
             pattern = comp_info["pattern"]
             if pattern.startswith('*'):
-                # Convert glob pattern to potential companion path
-                companion = self.path / (base_path + pattern[1:])
-                if companion.exists() and companion != file_path:
-                    companions.append(companion)
+                # Convert glob pattern to potential companion name
+                companion_name = track_base.name + pattern[1:]
+                if companion_name in sibling_names:
+                    companion = track_dir / companion_name
+                    if companion != file_path:
+                        companions.append(companion)
                     
         return companions
 
+    def clear_directory_cache(self) -> None:
+        """Forget cached directory listings used by ``find_companion_files``."""
+        self._dir_names_cache.clear()
+
+    def _directory_names(self, directory: Path) -> FrozenSet[str]:
+        """Returns the entry names of a directory, listing it only when it has changed.
+
+        Listings are cached per directory and reused while the directory's
+        mtime is unchanged, so looking up companions for every track of an
+        album costs one scan plus a stat per track. At most
+        ``DIR_NAMES_CACHE_SIZE`` directories are kept.
+
+        A directory whose mtime is within ``DIR_NAMES_RACY_WINDOW_NS`` of the
+        listing time is listed again on every call, so files created in the
+        same timestamp tick are not missed. This assumes the filesystem's
+        clock agrees with the local one to within that window; otherwise call
+        ``clear_directory_cache()`` after changing files.
+        """
+        key = str(directory)
+        try:
+            mtime_ns = os.stat(key).st_mtime_ns
+        except OSError:
+            return frozenset()
+        cache = self._dir_names_cache
+        cached = cache.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            cache.move_to_end(key)
+            return cached[1]
+        try:
+            with os.scandir(key) as entries:
+                names = frozenset(entry.name for entry in entries)
+        except OSError:
+            return frozenset()
+        if time.time_ns() - mtime_ns >= DIR_NAMES_RACY_WINDOW_NS:
+            cache[key] = (mtime_ns, names)
+            cache.move_to_end(key)
+            if len(cache) > DIR_NAMES_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.pop(key, None)
+        return names
+
     @staticmethod
     def load(schema_path: Path) -> 'DatasetComponentSchema':
         """Load schema from file.
@@ -431,8 +616,11 @@ class DatasetComponentSchema:
     def _load_schema(self) -> Dict[str, Any]:
         """Load schema from file."""
         if self.schema_path.exists():
-            with open(self.schema_path, 'r') as f:
-                return json.load(f)
+            with open(self.schema_path, 'rb') as f:
+                raw = f.read()
+            if ORJSON_AVAILABLE:
+                return orjson.loads(raw)
+            return json.loads(raw)
         return self._create_default_schema()
     
     def _create_default_schema(self) -> Dict[str, Any]:
@@ -544,47 +732,57 @@ class DatasetComponentSchema:
             for component in self.schema["components"]
         }
         
+        components = list(self.schema["components"])
+        classify = _component_classifier(tuple(config["pattern"] for config in self.schema["components"].values()))
+
         # Track files by base name to check multiple files constraint
         track_components = defaultdict(lambda: defaultdict(list))  # base_name -> component -> list of files
         track_files = defaultdict(list)  # base_name -> list of files
         
         # First pass: collect all files and identify tracks
-        for root, _, files in os.walk(validate_path):
-            # Skip .blackbird directory
-            if '.blackbird' in Path(root).parts:
-                continue
+        for root, dirs, files in os.walk(validate_path):
+            # Skip .blackbird directory without walking into it
+            if '.blackbird' in dirs:
+                dirs.remove('.blackbird')
                 
             for filename in files:
                 if filename.startswith('.'):
                     continue
                     
                 file_path = os.path.join(root, filename)
-                base_name = Path(filename).stem.split('_')[0]
+                # Base name is the stem (same split as Path.stem) up to its first
+                # underscore, found with one slice and no intermediate strings
+                dot = filename.rfind('.')
+                stem_end = dot if 0 < dot < len(filename) - 1 else len(filename)
+                underscore = filename.find('_', 0, stem_end)
+                base_name = filename[:underscore if underscore != -1 else stem_end]
                 track_files[base_name].append(filename)
                 result.stats["total_files"] += 1
                 
-                # Try to match file against component patterns
-                matched = False
-                for component, config in self.schema["components"].items():
-                    if fnmatch.fnmatch(filename, config["pattern"]):
-                        matched = True
-                        result.stats["matched_files"] += 1
-                        component_coverage[component]["matched"] += 1
-                        track_components[base_name][component].append(filename)
-                        break
-                
-                if not matched:
+                # Match file against all component patterns at once
+                component_index = classify(os.path.normcase(filename))
+                if component_index is not None:
+                    component = components[component_index]
+                    result.stats["matched_files"] += 1
+                    component_coverage[component]["matched"] += 1
+                    track_components[base_name][component].append(filename)
+                else:
                     result.stats["unmatched_files"] += 1
                     result.add_warning(f"Unmatched file: {file_path}")
         
-        # Second pass: check constraints for all tracks that have any files
-        for base_name, files in track_files.items():
-            # Check for multiple files constraint
-            for component, config in self.schema["components"].items():
-                if component in track_components[base_name] and not config["multiple"] and len(track_components[base_name][component]) > 1:
+        # Second pass: check the multiple files constraint for tracks with matched files,
+        # only looking at single-file components
+        single_components = [component for component, config in self.schema["components"].items() if not config["multiple"]]
+        for base_name in track_files:
+            matched_components = track_components.get(base_name)
+            if not matched_components:
+                continue
+            for component in single_components:
+                component_files = matched_components.get(component)
+                if component_files and len(component_files) > 1:
                     result.add_error(
                         f"Component '{component}' has multiple files for track '{base_name}' "
-                        f"but multiple files are not allowed: {', '.join(track_components[base_name][component])}"
+                        f"but multiple files are not allowed: {', '.join(component_files)}"
                     )
                     result.is_valid = False
         
@@ -604,51 +802,55 @@ class DatasetComponentSchema:
         """
         if isinstance(file_path, str):
             file_path = Path(file_path)
-            
-        try:
-            relative_path = file_path.relative_to(self.path)
-        except ValueError:
+
+        # Work on the string form to avoid building intermediate Path objects per file
+        path_str = str(file_path)
+        root_prefix = os.path.join(str(self.path), '')
+        if path_str.startswith(root_prefix):
+            relative_str = path_str[len(root_prefix):]
+        else:
             # If file_path is already relative, use it as is
-            relative_path = file_path
-            
-        # Remove component suffix and extension
-        base_path = relative_path.parent / relative_path.stem
-        for pattern in self.schema["components"].values():
-            pattern_base = Path(pattern["pattern"]).stem
-            if pattern_base.startswith("*"):
-                suffix = pattern_base[1:]
-                if base_path.name.endswith(suffix):
-                    base_path = base_path.parent / base_path.name[:-len(suffix)]
-                    break
-                    
-        return str(base_path)
+            relative_str = path_str
+        parent, filename = os.path.split(relative_str)
+
+        # Remove component suffix and extension (same split as Path.stem)
+        dot = filename.rfind('.')
+        name = filename[:dot] if 0 < dot < len(filename) - 1 else filename
+        patterns = tuple(comp["pattern"] for comp in self.schema["components"].values())
+        for suffix in _component_suffixes(patterns):
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+                break
+
+        if not name:
+            return parent or '.'
+        return os.path.join(parent, name) if parent else name
 
     def _list_tracks(self, dataset_path: str) -> List[str]:
         """List all tracks in the dataset by finding instrumental files."""
-        print(f"\nListing tracks in {dataset_path}")
-        tracks = set()
-        for root, _, files in os.walk(dataset_path):
-            try:
-                rel_path = Path(root).relative_to(dataset_path)
-            except ValueError:
-                print(f"Skipping root in _list_tracks: {root}")
-                continue
-                
-            # Skip .blackbird directory
-            if '.blackbird' in rel_path.parts:
-                print(f"Skipping .blackbird directory in _list_tracks: {rel_path}")
-                continue
-                
+        logger.debug(f"Listing tracks in {dataset_path}")
+        root = os.fspath(dataset_path)
+        prefix_len = len(os.path.join(root, ''))
+
+        def collect_tracks(entries: Iterable[os.DirEntry]) -> Set[str]:
             # Look for instrumental files to identify tracks
-            for file_name in files:
+            tracks = set()
+            for entry in entries:
+                file_name = entry.name
                 if '_instrumental.mp3' in file_name:
                     # Get base name by removing _instrumental.mp3
                     base_name = file_name.replace('_instrumental.mp3', '')
-                    track_path = str(rel_path / base_name)
-                    print(f"Found track: {track_path}")
+                    parent = os.path.dirname(entry.path[prefix_len:])
+                    if base_name:
+                        track_path = os.path.join(parent, base_name) if parent else base_name
+                    else:
+                        track_path = parent or '.'
+                    logger.debug(f"Found track: {track_path}")
                     tracks.add(track_path)
-                
-        print(f"Total tracks found: {len(tracks)}")
+            return tracks
+
+        tracks = set().union(*_collect_by_subtree(root, collect_tracks))
+        logger.debug(f"Total tracks found: {len(tracks)}")
         return sorted(list(tracks))
 
     def _list_track_files(self, track_path: str) -> List[str]:
@@ -691,27 +893,29 @@ class DatasetComponentSchema:
         component_files = defaultdict(list)
         unmatched_files = []
         
+        # Convert glob patterns to regexes for exact matching, once per report
+        component_regexes = [
+            (comp_name, re.compile(f"^.*{comp_info['pattern'][1:].replace('*', '.*')}$"))
+            for comp_name, comp_info in self.schema["components"].items()
+            if comp_info["pattern"].startswith('*')
+        ]
+
         # Walk through all files
-        for file_path in folder_path.rglob('*'):
-            if not file_path.is_file() or '.blackbird' in str(file_path):
-                continue
-                
+        root = str(folder_path)
+        prefix_len = len(os.path.join(root, ''))
+        for entry in _walk_files(root):
+            rel_path = entry.path[prefix_len:]
+
             # Try to match file against component patterns
             matched = False
-            for comp_name, comp_info in self.schema["components"].items():
-                pattern = comp_info["pattern"]
-                if pattern.startswith('*'):
-                    # Convert glob pattern to regex for exact matching
-                    regex_pattern = f"^.*{pattern[1:].replace('*', '.*')}$"
-                    if re.match(regex_pattern, file_path.name):
-                        rel_path = file_path.relative_to(folder_path)
-                        component_files[comp_name].append(str(rel_path))
-                        matched = True
-                        break
+            for comp_name, regex in component_regexes:
+                if regex.match(entry.name):
+                    component_files[comp_name].append(rel_path)
+                    matched = True
+                    break
                         
             if not matched:
-                rel_path = file_path.relative_to(folder_path)
-                unmatched_files.append(str(rel_path))
+                unmatched_files.append(rel_path)
                 
         # Print report
         print(f"\nAnalysis of folder: {folder_path}")
@@ -365,7 +365,7 @@ class StreamingPipeline:
                 ):
                     continue
 
-            for comp_name, symbolic_file_path in track_info.files.items():
+            for comp_name, symbolic_file_path, _ in track_info.iter_files():
                 if comp_name not in target_components:
                     continue
 
@@ -45,8 +45,9 @@ from .dataset import Dataset # Ensure Dataset is imported
 from .operations import (
     create_operation_state,
     load_operation_state, # Add load_operation_state
-    update_operation_state_file,
+    compact_operation_state,
     delete_operation_state,
+    OperationStateWriter,
     OperationStatus,
     OperationState # Add OperationState type
 )
@@ -595,7 +596,7 @@ class DatasetSync:
                      raise ValueError(f"Missing component filter '{missing_component}' not found in remote schema.")
                 tracks_missing_component = set()
                 for track_path, track_info in remote_index.tracks.items():
-                    if missing_component not in track_info.files:
+                    if missing_component not in track_info.component_names:
                         tracks_missing_component.add(track_path)
                 if not tracks_missing_component:
                     logger.info(f"No tracks found missing component '{missing_component}'. Sync will likely be empty.")
@@ -624,12 +625,9 @@ class DatasetSync:
                         continue # Skip if no album pattern matches
 
                 # Check desired components for this track
-                for comp_name, symbolic_file_path in track_info.files.items():
+                for comp_name, symbolic_file_path, size in track_info.iter_files():
                     if comp_name in component_patterns: # Check if this is one of the components we want
-                         if symbolic_file_path in track_info.file_sizes:
-                             files_to_sync[symbolic_file_path] = track_info.file_sizes[symbolic_file_path]
-                         else:
-                             logger.warning(f"File size missing for {symbolic_file_path} in remote index. Skipping.")
+                         files_to_sync[symbolic_file_path] = size
 
             stats.total_files = len(files_to_sync)
             stats.total_size = sum(files_to_sync.values())
@@ -689,6 +687,8 @@ class DatasetSync:
 
             processed_files_count = 0
             processed_bytes_count = 0
+            # Status updates from all workers are buffered and written in batches
+            state_writer = OperationStateWriter(state_file_path)
 
             # Inner function to process a batch of files
             def process_batch(batch_id, batch_files):
@@ -726,7 +726,7 @@ class DatasetSync:
                          # --- State Update ---
                          file_hash = symbolic_path_to_hash.get(symbolic_remote_path)
                          if state_file_path and file_hash is not None:
-                              update_operation_state_file(state_file_path, file_hash, f"failed: {error_message}")
+                              state_writer.mark(file_hash, f"failed: {error_message}")
                          # --- End State Update ---
                          return file_status, 0, error_message, downloaded_this_file
                     if profiling: profiling.add_timing('resolve_local_path', time.time_ns() - start_resolve)
@@ -745,7 +745,7 @@ class DatasetSync:
                             file_hash = symbolic_path_to_hash.get(symbolic_remote_path)
                             op_status: OperationStatus = "done" # Skipped is considered done
                             if state_file_path and file_hash is not None:
-                                update_operation_state_file(state_file_path, file_hash, op_status)
+                                state_writer.mark(file_hash, op_status)
                             # --- End State Update ---
                             return file_status, file_size, None, False # Return immediately
                         else:
@@ -815,7 +815,7 @@ class DatasetSync:
                          
                     if state_file_path and file_hash is not None and file_status != SyncState.PENDING:
                         start_state_update = time.time_ns() if profiling else 0
-                        update_operation_state_file(state_file_path, file_hash, op_status)
+                        state_writer.mark(file_hash, op_status)
                         if profiling: profiling.add_timing('update_state_file', time.time_ns() - start_state_update)
                     # --- End State Update ---
                         
@@ -845,7 +845,7 @@ class DatasetSync:
             # 4. Execute batches in parallel
             start_parallel = time.time_ns() if profiling else 0
             futures = []
-            with ThreadPoolExecutor(max_workers=parallel) as executor:
+            with state_writer, ThreadPoolExecutor(max_workers=parallel) as executor:
                 for i, batch in enumerate(batches):
                     futures.append(executor.submit(process_batch, i, batch))
 
@@ -890,6 +890,7 @@ class DatasetSync:
                 logger.error(f"{stats.failed_files} files failed to sync. Check logs for details.")
                 # --- Keep state file on failure ---
                 if state_file_path:
+                     compact_operation_state(state_file_path)
                      logger.info(f"Sync finished with errors. Operation state file kept at: {state_file_path}")
                 # --- End keep state file ---
             else:
@@ -1129,10 +1130,9 @@ def resume_sync_operation(
         # --- Resume Download Logic ---
         files_processed_in_resume = 0
         max_workers = parallel if parallel > 0 else 1
-        processed_hashes_in_batch = set()
-        batch_update_threshold = min(max(10, len(files_to_process) // 100), 500) # Update state file periodically
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+        with OperationStateWriter(state_file_path) as state_writer, \
+             ThreadPoolExecutor(max_workers=max_workers) as executor, \
              tqdm(total=len(files_to_process), desc="Resuming download", unit="file") as pbar:
             
             futures = {}
@@ -1170,13 +1170,7 @@ def resume_sync_operation(
                         state_status = f"failed: {error_msg}"
                     
                     # Update state file for this hash
-                    update_operation_state_file(state_file_path, file_hash, state_status)
-                    processed_hashes_in_batch.add(file_hash)
-
-                    # Periodically log progress (optional)
-                    # if len(processed_hashes_in_batch) >= batch_update_threshold:
-                    #     logger.debug(f"Updated state file for {len(processed_hashes_in_batch)} files.")
-                    #     processed_hashes_in_batch.clear()
+                    state_writer.mark(file_hash, state_status)
                     
                 except Exception as exc:
                     # Handle exceptions from the future itself (e.g., worker crash)
@@ -1184,8 +1178,7 @@ def resume_sync_operation(
                     logger.error(f"Error processing file {symbolic_path_unknown} (hash {file_hash}) during resume: {exc}", exc_info=True)
                     stats.failed_files += 1
                     # Update state file as failed
-                    update_operation_state_file(state_file_path, file_hash, f"failed: {exc}")
-                    processed_hashes_in_batch.add(file_hash)
+                    state_writer.mark(file_hash, f"failed: {exc}")
                 finally:
                     pbar.update(1)
 
@@ -1195,6 +1188,7 @@ def resume_sync_operation(
             delete_operation_state(state_file_path) # Delete state file on success
             return True
         else:
+            compact_operation_state(state_file_path)
             logger.warning(f"Resume finished with {stats.failed_files} errors. State file kept: {state_file_path}")
             return False
             
@@ -99,6 +99,7 @@ def test_cli_location_balance(mock_rebuild, mock_move_data, runner, temp_cli_dat
     assert call_kwargs.get('size_limit_gb') == 0.1
     assert call_kwargs.get('specific_folders') is None
     assert call_kwargs.get('dry_run') is False
+    assert call_kwargs.get('parallel') == 1
 
     assert f"Attempting to move approximately" in result.output # Check for actual log message
     assert "Move operation complete!" in result.output
@@ -166,6 +167,7 @@ def test_cli_location_move_folders(mock_rebuild, mock_move_data, runner, temp_cl
     cmd_list = [
         'location', 'move-folders',
         '--source-location', TEST_LOC1_NAME,
+        '--parallel', '4',
         str(temp_cli_dataset),  # dataset_path
         TEST_LOC2_NAME,        # target_loc
         folders_to_move_str    # folders_str (single argument)
@@ -185,6 +187,7 @@ def test_cli_location_move_folders(mock_rebuild, mock_move_data, runner, temp_cl
     # Check that the split list was passed to move_data
     assert call_kwargs.get('specific_folders') == folders_to_move_list
     assert call_kwargs.get('dry_run') is False
+    assert call_kwargs.get('parallel') == 4
 
     assert f"Attempting to move folders" in result.output
     assert "Moved 1 files" in result.output
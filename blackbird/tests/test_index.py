@@ -194,4 +194,163 @@ def test_index_stats_by_location(sample_index):
     assert sample_index.stats_by_location["Main"]["total_size"] == 1000
     assert sample_index.stats_by_location["Loc2"]["total_size"] == 1500
     assert sample_index.stats_by_location["Loc3"]["total_size"] == 2000
-    assert sample_index.total_size == 4500 # Verify aggregate total size 
\ No newline at end of file
+    assert sample_index.total_size == 4500 # Verify aggregate total size 
+
+def test_track_info_compact_storage():
+    """Component files are stored as tuples relative to the location, behind the usual mappings."""
+    track = TrackInfo(
+        track_path="Main/Artist1/Album1/Track1",
+        artist="Artist1",
+        album_path="Main/Artist1/Album1",
+        cd_number=None,
+        base_name="Track1",
+        files={"instrumental_audio": "Main/Artist1/Album1/Track1_instrumental.wav",
+               "vocals_audio": "Main/Artist1/Album1/Track1_vocals.wav"},
+        file_sizes={"Main/Artist1/Album1/Track1_instrumental.wav": 1000,
+                    "Main/Artist1/Album1/Track1_vocals.wav": 500},
+    )
+    assert not hasattr(track, "__dict__")
+    assert track.component_names == ("instrumental_audio", "vocals_audio")
+    assert track.sizes == (1000, 500)
+    # The location prefix is stored once, paths are kept relative to it
+    assert track.location == "Main"
+    assert track.rel_track_path == "Artist1/Album1/Track1"
+    assert track.rel_file_paths == ("Artist1/Album1/Track1_instrumental.wav", "Artist1/Album1/Track1_vocals.wav")
+    assert track.track_path == "Main/Artist1/Album1/Track1"
+    assert track.album_path == "Main/Artist1/Album1"
+    assert track.files["vocals_audio"] == "Main/Artist1/Album1/Track1_vocals.wav"
+    assert track.file_sizes["Main/Artist1/Album1/Track1_vocals.wav"] == 500
+    assert list(track.iter_files()) == [
+        ("instrumental_audio", "Main/Artist1/Album1/Track1_instrumental.wav", 1000),
+        ("vocals_audio", "Main/Artist1/Album1/Track1_vocals.wav", 500),
+    ]
+
+    # Edits to the mappings are written back to the track
+    track.files["drums_audio"] = "Main/Artist1/Album1/Track1_drums.wav"
+    track.file_sizes["Main/Artist1/Album1/Track1_drums.wav"] = 300
+    assert track.component_names == ("instrumental_audio", "vocals_audio", "drums_audio")
+    assert track.sizes == (1000, 500, 300)
+    del track.files["drums_audio"]
+    assert "Main/Artist1/Album1/Track1_drums.wav" not in track.file_sizes
+    # Sizes exist only for the track's files
+    with pytest.raises(KeyError):
+        track.file_sizes["Main/Artist1/Album1/Track1_bass.wav"] = 1
+
+    # Replacing the files mapping keeps sizes of paths that are still present
+    track.files = {"instrumental_audio": "Main/Artist1/Album1/Track1_instrumental.wav"}
+    assert track.file_sizes == {"Main/Artist1/Album1/Track1_instrumental.wav": 1000}
+
+def test_track_info_loads_legacy_pickle_state():
+    """Pickle state with full symbolic paths, as dicts or as tuples, is compacted on load."""
+    track = TrackInfo.__new__(TrackInfo)
+    track.__setstate__({
+        "track_path": "Main/Artist1/Album1/Track1",
+        "artist": "Artist1",
+        "album_path": "Main/Artist1/Album1",
+        "cd_number": None,
+        "base_name": "Track1",
+        "files": {"instrumental_audio": "Main/Artist1/Album1/Track1_instrumental.wav"},
+        "file_sizes": {"Main/Artist1/Album1/Track1_instrumental.wav": 1000},
+    })
+    assert track.files == {"instrumental_audio": "Main/Artist1/Album1/Track1_instrumental.wav"}
+    assert track.file_sizes == {"Main/Artist1/Album1/Track1_instrumental.wav": 1000}
+
+    # Tuple layout with full symbolic paths
+    track = TrackInfo.__new__(TrackInfo)
+    track.__setstate__({
+        "track_path": "Main/Artist1/Album1/Track1",
+        "artist": "Artist1",
+        "album_path": "Main/Artist1/Album1",
+        "cd_number": None,
+        "base_name": "Track1",
+        "component_names": ("instrumental_audio",),
+        "file_paths": ("Main/Artist1/Album1/Track1_instrumental.wav",),
+        "sizes": (1000,),
+    })
+    assert track.location == "Main"
+    assert track.file_sizes == {"Main/Artist1/Album1/Track1_instrumental.wav": 1000}
+
+def test_track_info_pickle_loads_in_older_clients():
+    """TrackInfo pickles keep the original dataclass fields, which older clients expect."""
+    import io
+    import pickle
+    from dataclasses import dataclass
+    from typing import Dict, Optional
+
+    @dataclass
+    class LegacyTrackInfo:
+        track_path: str
+        artist: str
+        album_path: str
+        cd_number: Optional[str]
+        base_name: str
+        files: Dict[str, str]
+        file_sizes: Dict[str, int]
+
+    class LegacyUnpickler(pickle.Unpickler):
+        def find_class(self, module, name):
+            if (module, name) == ("blackbird.index", "TrackInfo"):
+                return LegacyTrackInfo
+            return super().find_class(module, name)
+
+    track = TrackInfo(
+        track_path="Main/Artist1/Album1/Track1",
+        artist="Artist1",
+        album_path="Main/Artist1/Album1",
+        cd_number=None,
+        base_name="Track1",
+        files={"instrumental_audio": "Main/Artist1/Album1/Track1_instrumental.wav"},
+        file_sizes={"Main/Artist1/Album1/Track1_instrumental.wav": 1000},
+    )
+    data = pickle.dumps(track, protocol=5)
+    legacy = LegacyUnpickler(io.BytesIO(data)).load()
+    assert legacy.track_path == "Main/Artist1/Album1/Track1"
+    assert legacy.files == {"instrumental_audio": "Main/Artist1/Album1/Track1_instrumental.wav"}
+    assert legacy.file_sizes == {"Main/Artist1/Album1/Track1_instrumental.wav": 1000}
+
+    loaded = pickle.loads(data)
+    assert loaded == track
+    assert loaded.location == "Main"
+
+def test_track_info_paths_outside_track_location():
+    """File paths outside the track's location are kept verbatim."""
+    track = TrackInfo(
+        track_path="Main/Artist1/Album1/Track1",
+        artist="Artist1",
+        album_path="Main/Artist1/Album1",
+        cd_number=None,
+        base_name="Track1",
+        files={"instrumental_audio": "Other/Artist1/Album1/Track1_instrumental.wav"},
+        file_sizes={"Other/Artist1/Album1/Track1_instrumental.wav": 10},
+    )
+    assert track.location is None
+    assert track.files == {"instrumental_audio": "Other/Artist1/Album1/Track1_instrumental.wav"}
+
+    # Moving the track back under a single location compacts the paths again
+    track.files = {"instrumental_audio": "Main/Artist1/Album1/Track1_instrumental.wav"}
+    assert track.location == "Main"
+    track.track_path = "Loc2/Artist1/Album1/Track1"
+    assert track.location is None
+    assert track.track_path == "Loc2/Artist1/Album1/Track1"
+
+def test_index_save_load_roundtrip(sample_index, tmp_path):
+    """A saved index loads back with the same tracks."""
+    index_path = tmp_path / "index.pickle"
+    sample_index.save(index_path)
+    loaded = DatasetIndex.load(index_path)
+    assert loaded.tracks == sample_index.tracks
+    assert loaded.total_size == sample_index.total_size
+
+def test_search_by_artist_fuzzy_skips_impossible_lengths(sample_index):
+    """Fuzzy search only compares artists whose name length can reach the cutoff."""
+    sample_index.album_by_artist["A Very Long Artist Name Indeed"] = set()
+    candidates = sample_index._fuzzy_artist_candidates("artst1", case_sensitive=False, cutoff=0.6)
+    assert sorted(candidates) == ["Artist1", "Artist2"]
+    assert sample_index.search_by_artist("Artst2", fuzzy_search=True)[0] == "Artist2"
+
+    # Artists are picked up after any change, also one that keeps their count
+    sample_index.album_by_artist["Artist3"] = sample_index.album_by_artist.pop("Artist2")
+    candidates = sample_index._fuzzy_artist_candidates("artst1", case_sensitive=False, cutoff=0.6)
+    assert sorted(candidates) == ["Artist1", "Artist3"]
+    assert sample_index.search_by_artist("Artst3", fuzzy_search=True)[0] == "Artist3"
+
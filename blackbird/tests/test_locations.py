@@ -1,5 +1,7 @@
 import pytest
 import json
+import os
+import time
 from pathlib import Path
 
 from blackbird.locations import LocationsManager, resolve_symbolic_path, LocationValidationError, SymbolicPathError
@@ -219,6 +221,61 @@ def test_locations_json_persistence(temp_dataset_dir, locations_json_path, extra
     assert lm2.get_all_locations() == expected
 
 
+
+def test_load_locations_uses_cache_until_file_changes(temp_dataset_dir, locations_json_path, extra_dirs, monkeypatch):
+    """Test that an unchanged locations.json is not re-parsed, and a modified one is."""
+    dir1, dir2 = extra_dirs
+    locations_json_path.parent.mkdir(exist_ok=True)
+    locations_json_path.write_text(json.dumps({"Main": str(temp_dataset_dir), "A": str(dir1)}))
+    # Recently modified files aren't cached, see test_load_locations_rereads_recent_file
+    old = time.time() - 60
+    os.utime(locations_json_path, (old, old))
+    LocationsManager(temp_dataset_dir).load_locations()
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("locations.json should have been served from the cache")
+
+    monkeypatch.setattr("blackbird.locations._decode_locations_json", fail_decode)
+    lm = LocationsManager(temp_dataset_dir)
+    assert lm.load_locations() == {"Main": temp_dataset_dir.resolve(), "A": dir1.resolve()}
+    monkeypatch.undo()
+
+    # A different file size invalidates the cached entry
+    locations_json_path.write_text(json.dumps({"Main": str(temp_dataset_dir), "Other": str(dir2)}))
+    assert lm.load_locations() == {"Main": temp_dataset_dir.resolve(), "Other": dir2.resolve()}
+
+    LocationsManager.flush_cache()
+    assert LocationsManager._cache == {}
+
+
+def test_load_locations_rereads_recent_file(temp_dataset_dir, locations_json_path, extra_dirs):
+    """Test that a same-size rewrite within one timestamp tick is not served from the cache."""
+    dir1, dir2 = extra_dirs
+    locations_json_path.parent.mkdir(exist_ok=True)
+    locations_json_path.write_text(json.dumps({"Main": str(temp_dataset_dir), "A": str(dir1)}))
+    st = os.stat(locations_json_path)
+    lm = LocationsManager(temp_dataset_dir)
+    assert "A" in lm.load_locations()
+
+    # Same size and mtime, different contents
+    locations_json_path.write_text(json.dumps({"Main": str(temp_dataset_dir), "B": str(dir1)}))
+    os.utime(locations_json_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert os.stat(locations_json_path).st_size == st.st_size
+    assert "B" in lm.load_locations()
+
+
+
+def test_load_locations_keeps_symlinks_verbatim(temp_dataset_dir, locations_json_path, extra_dirs, tmp_path):
+    """Test that stored location paths are normalized but symlinks are not followed."""
+    dir1, _ = extra_dirs
+    link = tmp_path / "link_to_dir1"
+    link.symlink_to(dir1, target_is_directory=True)
+    locations_json_path.parent.mkdir(exist_ok=True)
+    locations_json_path.write_text(json.dumps({"Main": str(temp_dataset_dir), "Linked": f"{link}/./sub/.."}))
+
+    locations = LocationsManager(temp_dataset_dir).load_locations()
+    assert locations["Linked"] == link
+
 # == Symbolic Path Resolution Tests (using standalone function) ==
 
 def test_resolve_symbolic_path_valid(sample_locations_real_paths):
@@ -264,3 +321,201 @@ def test_resolve_symbolic_path_with_spaces(sample_locations_real_paths):
     """Test resolving paths containing spaces using temporary directories."""
     assert resolve_symbolic_path("Spaced Loc/Artist Name/Album Title/track name.mp3", sample_locations_real_paths) == \
            sample_locations_real_paths["Spaced Loc"] / "Artist Name/Album Title/track name.mp3"
+
+
+def test_resolve_symbolic_path_is_memoized_across_dict_copies(sample_locations_real_paths):
+    """Test that base path checks are cached on location content, not on the dict identity."""
+    from blackbird.locations import _validate_base
+    LocationsManager.flush_cache()
+    first = resolve_symbolic_path("Main/Artist/track.mp3", dict(sample_locations_real_paths))
+    second = resolve_symbolic_path("Main/Artist/other.mp3", dict(sample_locations_real_paths))
+    assert first.parent == second.parent
+    assert _validate_base.cache_info().misses == 1
+
+    # '..' components are still normalized
+    assert resolve_symbolic_path("Main/Artist/../track.mp3", sample_locations_real_paths) == \
+           sample_locations_real_paths["Main"].resolve() / "track.mp3"
+
+
+def test_getters_load_locations_only_once(locations_manager, temp_dataset_dir, monkeypatch):
+    """Test that getters don't re-read locations.json once it has been loaded."""
+    assert locations_manager.get_location_path("Main") == temp_dataset_dir.resolve()
+
+    def fail_load(self):
+        raise AssertionError("load_locations should not be called again")
+
+    monkeypatch.setattr(LocationsManager, "load_locations", fail_load)
+    assert locations_manager.get_location_path("Main") == temp_dataset_dir.resolve()
+    assert locations_manager.get_all_locations() == {"Main": temp_dataset_dir.resolve()}
+    with pytest.raises(KeyError):
+        locations_manager.get_location_path("Missing")
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_load_locations_rejects_invalid_json(locations_manager, locations_json_path, monkeypatch, use_msgspec):
+    """Test that malformed or mistyped locations.json raises LocationValidationError with either decoder."""
+    import blackbird.locations as locations_module
+    if use_msgspec and not locations_module.MSGSPEC_AVAILABLE:
+        pytest.skip("msgspec not installed")
+    monkeypatch.setattr(locations_module, "MSGSPEC_AVAILABLE", use_msgspec)
+    LocationsManager.flush_cache()
+
+    locations_json_path.write_text("{not json")
+    with pytest.raises(LocationValidationError, match="Error decoding JSON"):
+        locations_manager.load_locations()
+
+    locations_json_path.write_text('["a list", "of paths"]')
+    with pytest.raises(LocationValidationError, match="Invalid format"):
+        locations_manager.load_locations()
+
+
+def test_dataset_root_validated_once(temp_dataset_dir, monkeypatch):
+    """Test that repeated managers for the same root skip the is_dir/resolve checks."""
+    LocationsManager.flush_root_cache()
+    LocationsManager(temp_dataset_dir)
+
+    def fail_is_dir(self):
+        raise AssertionError("dataset root should not be re-checked")
+
+    monkeypatch.setattr(Path, "is_dir", fail_is_dir)
+    assert LocationsManager(temp_dataset_dir).dataset_root_path == temp_dataset_dir.resolve()
+    monkeypatch.undo()
+
+    LocationsManager.flush_root_cache()
+    temp_dataset_dir.rmdir()
+    with pytest.raises(ValueError, match="is not a valid directory"):
+        LocationsManager(temp_dataset_dir)
+
+
+def test_get_all_location_strings(locations_manager, temp_dataset_dir, extra_dirs):
+    """Test the string-valued locations view and resolving against it."""
+    dir1, _ = extra_dirs
+    locations_manager.add_location("Backup", str(dir1))
+    strings = locations_manager.get_all_location_strings()
+    assert strings == {"Main": str(temp_dataset_dir.resolve()), "Backup": str(dir1.resolve())}
+    assert resolve_symbolic_path("Backup/a/b.mp3", strings) == dir1.resolve() / "a/b.mp3"
+    assert locations_manager.get_location_path("Backup") == dir1.resolve()
+
+
+def test_locations_manager_has_no_instance_dict(locations_manager):
+    """Test that LocationsManager instances use slots."""
+    assert not hasattr(locations_manager, "__dict__")
+    with pytest.raises(AttributeError):
+        locations_manager.unexpected_attribute = 1
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_save_locations_replaces_file_atomically(locations_manager, locations_json_path, extra_dirs, monkeypatch, use_orjson):
+    """Test that saving leaves no temp file behind and the result reloads with either encoder."""
+    import blackbird.locations as locations_module
+    if use_orjson and not locations_module.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(locations_module, "ORJSON_AVAILABLE", use_orjson)
+    dir1, _ = extra_dirs
+
+    locations_manager.add_location("Backup", str(dir1))
+    locations_manager.save_locations()
+
+    assert not locations_json_path.with_suffix(".json.tmp").exists()
+    assert json.loads(locations_json_path.read_text())["Backup"] == str(dir1.resolve())
+    assert LocationsManager(locations_manager.dataset_root_path).load_locations()["Backup"] == dir1.resolve()
+
+
+def test_make_resolver_matches_resolve_symbolic_path(sample_locations_real_paths, tmp_path):
+    """Test that the specialized resolver agrees with resolve_symbolic_path."""
+    from blackbird.locations import make_resolver
+    locations = dict(sample_locations_real_paths)
+    locations["Gone"] = tmp_path / "does_not_exist"
+    resolver = make_resolver(locations)
+
+    for symbolic in ["Main/Artist/Album/track.mp3", "Spaced Loc/A B/c d.mp3", "SSD_Fast", "Archive/x/../y.txt"]:
+        assert resolver(symbolic) == str(resolve_symbolic_path(symbolic, sample_locations_real_paths))
+
+    with pytest.raises(SymbolicPathError, match="Unknown location name 'Nope'"):
+        resolver("Nope/a.mp3")
+    with pytest.raises(SymbolicPathError, match="does not exist"):
+        resolver("Gone/a.mp3")
+    with pytest.raises(SymbolicPathError, match="invalid or directory-like"):
+        resolver("Main/")
+
+
+def test_add_location_without_validation(locations_manager, extra_dirs, tmp_path):
+    """Test bulk-adding unvalidated locations and checking them in one pass."""
+    dir1, _ = extra_dirs
+    missing = tmp_path / "missing_dir"
+    a_file = tmp_path / "a_file.txt"
+    a_file.write_text("x")
+
+    locations_manager.add_location("Ok", str(dir1), validate=False)
+    locations_manager.add_location("Missing", str(missing), validate=False)
+    locations_manager.add_location("File", str(a_file), validate=False)
+    assert locations_manager.get_location_path("Missing") == missing
+
+    errors = dict(locations_manager.validate_all_locations())
+    assert set(errors) == {"Missing", "File"}
+    assert "does not exist" in errors["Missing"]
+    assert "not a directory" in errors["File"]
+
+
+def test_validate_many_locations(locations_manager, tmp_path):
+    """Test bulk validation of many locations at once."""
+    for i in range(10):
+        location_dir = tmp_path / f"bulk_{i}"
+        if i % 3:
+            location_dir.mkdir()
+        elif i % 2:
+            location_dir.write_text("not a dir")
+        locations_manager.add_location(f"Bulk{i}", str(location_dir), validate=False)
+
+    errors = dict(locations_manager.validate_all_locations())
+    assert set(errors) == {"Bulk0", "Bulk3", "Bulk6", "Bulk9"}
+    assert "does not exist" in errors["Bulk0"]
+    assert "not a directory" in errors["Bulk3"]
+
+
+def test_location_names_are_interned(temp_dataset_dir, locations_json_path, extra_dirs):
+    """Test that loaded location names are the same objects as TrackInfo location prefixes."""
+    import sys
+    dir1, _ = extra_dirs
+    name = "".join(["Ar", "chive"]) # Built at runtime so it isn't a compile-time constant
+    locations_json_path.parent.mkdir(exist_ok=True)
+    locations_json_path.write_text(json.dumps({"Main": str(temp_dataset_dir), name: str(dir1)}))
+    LocationsManager.flush_cache()
+
+    loaded_names = list(LocationsManager(temp_dataset_dir).load_locations())
+    assert loaded_names[1] is sys.intern(name)
+
+
+def test_symbolic_path_error_formats_lazily(sample_locations_real_paths):
+    """Test structured SymbolicPathError fields and its formatted message."""
+    with pytest.raises(SymbolicPathError) as excinfo:
+        resolve_symbolic_path("UnknownLoc/some/path.file", sample_locations_real_paths)
+    error = excinfo.value
+    assert error.kind == "unknown_location"
+    assert error.symbolic_path == "UnknownLoc/some/path.file"
+    assert str(error) == ("Unknown location name 'UnknownLoc' in symbolic path 'UnknownLoc/some/path.file'. "
+                          f"Available locations: {list(sample_locations_real_paths.keys())}")
+    assert str(SymbolicPathError("plain message")) == "plain message"
+
+
+def test_resolve_symbolic_path_follows_symlinks_inside_location(sample_locations_real_paths):
+    """Test that symlinks inside a location are canonicalized, as Path.resolve() does."""
+    main = sample_locations_real_paths["Main"]
+    (main / "real_album").mkdir()
+    (main / "linked_album").symlink_to(main / "real_album", target_is_directory=True)
+    assert resolve_symbolic_path("Main/linked_album/track.mp3", sample_locations_real_paths) == \
+           main.resolve() / "real_album" / "track.mp3"
+
+
+def test_removed_location_is_rechecked_after_reload(temp_dataset_dir, extra_dirs):
+    """Test that a cached base path check does not outlive a reload of the locations."""
+    dir1, _ = extra_dirs
+    manager = LocationsManager(temp_dataset_dir)
+    manager.add_location("Ext", str(dir1))
+    manager.save_locations()
+    assert resolve_symbolic_path("Ext/a.mp3", manager.get_all_location_strings()) == dir1.resolve() / "a.mp3"
+
+    dir1.rmdir()
+    manager.load_locations()
+    with pytest.raises(SymbolicPathError, match="does not exist"):
+        resolve_symbolic_path("Ext/a.mp3", manager.get_all_location_strings())
@@ -375,3 +375,23 @@ class TestComponentAggregation:
         assert main_stats["track_count"] == 3
         assert main_stats["artist_count"] == 2
         assert main_stats["total_size"] > 0
+
+
+class TestBuildWithoutSizes:
+    """Tests for building an index with collect_sizes=False."""
+
+    def test_tracks_indexed_with_zero_sizes(self, multi_component_dataset):
+        schema = DatasetComponentSchema(multi_component_dataset)
+        index = DatasetIndex.build(multi_component_dataset, schema, collect_sizes=False)
+
+        assert len(index.tracks) == 3
+        assert index.total_size == 0
+        for track in index.tracks.values():
+            assert set(track.file_sizes.values()) == {0}
+        assert index.stats_by_location["Main"]["total_size"] == 0
+        assert index.sizes_collected is False
+
+    def test_sizes_collected_by_default(self, multi_component_dataset):
+        schema = DatasetComponentSchema(multi_component_dataset)
+        index = DatasetIndex.build(multi_component_dataset, schema)
+        assert index.sizes_collected is True
@@ -1,15 +1,20 @@
 import pytest
+import errno
+import json
 import shutil
 import os
 from pathlib import Path
 import pickle
 import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 
 from blackbird.index import DatasetIndex, TrackInfo
 from blackbird.dataset import Dataset
 from blackbird.locations import LocationsManager, resolve_symbolic_path, SymbolicPathError
-from blackbird.mover import move_data
+from blackbird import operations
+from blackbird import mover
+from blackbird.mover import move_data, _fast_copy
 from blackbird.operations import create_operation_state, load_operation_state, update_operation_state_file, delete_operation_state
 
 # Constants for location names
@@ -109,7 +114,7 @@ def setup_test_environment(tmp_path):
             track_path = track3_path
             component = "other"
         index.tracks[track_path].files[component] = symbolic_path
-        index.tracks[track_path].file_sizes[component] = size
+        index.tracks[track_path].file_sizes[symbolic_path] = size
 
     # Save the index
     index_file = bb_dir / "index.pickle"
@@ -147,7 +152,8 @@ def test_move_by_size_limit(mock_rebuild, mock_delete_state, mock_shutil_move, s
 
     assert move_stats["moved_files"] == 1
     state_file_path = move_stats.get("state_file_path")
-    mock_shutil_move.assert_called_once_with(str(expected_source_abs), str(expected_target_abs))
+    mock_shutil_move.assert_called_once_with(str(expected_source_abs), str(expected_target_abs),
+                                             copy_function=_fast_copy)
     # Check state file content before deletion
     assert state_file_path is not None
     assert state_file_path.exists() # Ensure it exists before loading
@@ -324,6 +330,419 @@ def test_move_no_files_found(setup_test_environment):
     assert move_stats_2["moved_files"] == 0
     assert move_stats_2.get("state_file_path") is None
 
+@patch('shutil.move')
+def test_move_size_limit_requires_collected_sizes(mock_shutil_move, setup_test_environment):
+    """A size-limited move refuses to run on an index built without file sizes."""
+    dataset, *_ = setup_test_environment
+    dataset.index.sizes_collected = False
+
+    with pytest.raises(ValueError, match="without file sizes"):
+        move_data(dataset=dataset, source_location_name=LOC_MAIN, target_location_name=LOC_SSD,
+                  size_limit_gb=1)
+    mock_shutil_move.assert_not_called()
+
 # --- Resume logic is implicitly tested via interruption test + resume tests --- #
 # We don't add explicit resume tests here as mover.py doesn't have a resume function
-# The resume logic lives in the CLI/sync/resume modules. 
\ No newline at end of file
+# The resume logic lives in the CLI/sync/resume modules. 
+
+@patch('shutil.move')
+@patch('blackbird.operations.delete_operation_state')
+def test_move_batches_state_updates(mock_delete_state, mock_shutil_move, setup_test_environment):
+    """Successful moves are appended to the state log in one batch, not per file."""
+    dataset, *_ = setup_test_environment
+    with patch('blackbird.operations.append_operation_log',
+               wraps=operations.append_operation_log) as mock_append:
+        move_stats = move_data(
+            dataset=dataset,
+            source_location_name=LOC_MAIN,
+            target_location_name=LOC_HDD,
+            specific_folders=["Artist1/AlbumA"],
+        )
+
+    assert move_stats["moved_files"] == 2
+    assert mock_append.call_count == 1
+    state_file_path = move_stats["state_file_path"]
+    assert operations.get_state_log_path(state_file_path).exists()
+    state_data = load_operation_state(state_file_path)
+    assert set(state_data["files"].values()) == {"done"}
+    mock_delete_state.assert_called_once_with(state_file_path)
+    operations.get_state_log_path(state_file_path).unlink()
+    state_file_path.unlink()
+
+
+def test_state_writer_adapts_batch_size(tmp_path, monkeypatch):
+    """Batch size grows when updates arrive quickly and shrinks when they are slow."""
+    hashes = list(range(200))
+    state_file = create_operation_state(tmp_path, "move", LOC_MAIN, LOC_SSD, hashes)
+
+    now = [0.0]
+    monkeypatch.setattr('blackbird.operations.time.monotonic', lambda: now[0])
+    flusher = operations.OperationStateWriter(state_file, batch_size=32, interval=2.0)
+    for h in hashes[:32]:
+        flusher.mark(h, "done")
+    assert flusher.flush_count == 1
+    assert flusher.batch_size == 64
+
+    flusher.mark(hashes[32], "done")
+    now[0] += 3.0
+    flusher.mark(hashes[33], "done")
+    assert flusher.flush_count == 2
+    assert flusher.batch_size == 32
+
+    flusher.mark(hashes[34], "failed: boom")
+    flusher.close()
+    files = load_operation_state(state_file)["files"]
+    assert all(files[h] == "done" for h in hashes[:34])
+    assert files[hashes[34]] == "failed: boom"
+    assert files[hashes[35]] == "pending"
+
+
+def test_state_writer_context_manager_threads(tmp_path):
+    """Updates marked from several threads are all written when the writer exits."""
+    hashes = list(range(1000))
+    state_file = create_operation_state(tmp_path, "sync", LOC_MAIN, LOC_SSD, hashes)
+
+    with operations.OperationStateWriter(state_file, batch_size=16) as writer:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda h: writer.mark(h, "done"), hashes))
+
+    assert set(load_operation_state(state_file)["files"].values()) == {"done"}
+
+
+def _mark_done_one_by_one(state_file, hashes):
+    for h in hashes:
+        operations.update_operation_state_file(state_file, h, "done")
+
+
+@pytest.mark.skipif(operations.fcntl is None, reason="flock not available")
+def test_concurrent_state_updates_are_not_lost(tmp_path):
+    """Read-modify-write updates from several processes serialize on the state file lock."""
+    import multiprocessing
+    hashes = list(range(80))
+    state_file = create_operation_state(tmp_path, "move", LOC_MAIN, LOC_SSD, hashes)
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_mark_done_one_by_one, args=(state_file, hashes[i::4])) for i in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert all(w.exitcode == 0 for w in workers)
+    assert set(load_operation_state(state_file)["files"].values()) == {"done"}
+
+    delete_operation_state(state_file)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_update_operation_state_bulk_skips_unknown_hashes(tmp_path):
+    """Unknown hashes are ignored while the rest of the batch is applied."""
+    state_file = create_operation_state(tmp_path, "move", LOC_MAIN, LOC_SSD, [1, 2])
+    operations.update_operation_state_bulk(state_file, {1: "done", 99: "done"})
+    files = load_operation_state(state_file)["files"]
+    assert files == {1: "done", 2: "pending"}
+
+
+def test_failed_state_write_keeps_previous_file(tmp_path, monkeypatch):
+    """A write that fails midway leaves the old state file intact and no temp file behind."""
+    state_file = create_operation_state(tmp_path, "move", LOC_MAIN, LOC_SSD, [1, 2])
+
+    def failing_fsync(fd):
+        raise OSError(errno.EIO, "simulated I/O error")
+
+    monkeypatch.setattr('blackbird.utils.os.fsync', failing_fsync)
+    operations.update_operation_state_bulk(state_file, {1: "done"})
+    monkeypatch.undo()
+
+    assert load_operation_state(state_file)["files"] == {1: "pending", 2: "pending"}
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_operation_log_replay_and_compaction(tmp_path):
+    """Logged updates overlay the snapshot on load and are merged by compaction."""
+    state_file = create_operation_state(tmp_path, "move", LOC_MAIN, LOC_SSD, [1, 2, 3])
+    with operations.open_operation_log(state_file) as log:
+        operations.append_operation_log(log, {1: "done", 2: 'failed: "quoted"'})
+        operations.append_operation_log(log, {1: "failed: retry"})
+        log.write('{"h":3,"s":"do')  # Truncated by a crash
+    log_path = operations.get_state_log_path(state_file)
+
+    expected = {1: "failed: retry", 2: 'failed: "quoted"', 3: "pending"}
+    assert load_operation_state(state_file)["files"] == expected
+
+    operations.compact_operation_state(state_file)
+    assert not log_path.exists()
+    assert load_operation_state(state_file)["files"] == expected
+
+
+@patch('shutil.move', side_effect=OSError("Disk full"))
+def test_move_failure_compacts_state_log(mock_shutil_move, setup_test_environment):
+    """A move that stops on failure leaves a single consolidated state file."""
+    dataset, *_ = setup_test_environment
+    move_stats = move_data(
+        dataset=dataset,
+        source_location_name=LOC_MAIN,
+        target_location_name=LOC_SSD,
+        specific_folders=["Artist1/AlbumA"],
+    )
+    state_file_path = move_stats["state_file_path"]
+    assert not operations.get_state_log_path(state_file_path).exists()
+    statuses = sorted(load_operation_state(state_file_path)["files"].values())
+    assert statuses[0].startswith("failed: Disk full")
+    assert statuses[1] == "pending"
+    state_file_path.unlink()
+
+
+def test_move_parallel(setup_test_environment):
+    """Files are moved correctly when several moves run at once."""
+    dataset, main_path, _, hdd_path = setup_test_environment
+    move_stats = move_data(
+        dataset=dataset,
+        source_location_name=LOC_MAIN,
+        target_location_name=LOC_HDD,
+        specific_folders=["Artist1/AlbumA"],
+        parallel=4,
+    )
+
+    assert move_stats["moved_files"] == 2
+    assert move_stats["failed_files"] == 0
+    for name, content in [("track1_vocals.flac", "main_data1"), ("track1_drums.flac", "main_data2")]:
+        assert not (main_path / "Artist1" / "AlbumA" / name).exists()
+        assert (hdd_path / "Artist1" / "AlbumA" / name).read_text() == content
+    assert not move_stats["state_file_path"].exists()
+
+
+def test_move_file_already_at_target(setup_test_environment):
+    """A file moved by an interrupted run but not yet recorded counts as moved."""
+    dataset, main_path, _, hdd_path = setup_test_environment
+    source = main_path / "Artist1" / "AlbumA" / "track1_vocals.flac"
+    target = hdd_path / "Artist1" / "AlbumA" / "track1_vocals.flac"
+    target.parent.mkdir(parents=True)
+    shutil.move(str(source), str(target))
+
+    move_stats = move_data(
+        dataset=dataset,
+        source_location_name=LOC_MAIN,
+        target_location_name=LOC_HDD,
+        specific_folders=["Artist1/AlbumA"],
+    )
+
+    assert move_stats["moved_files"] == 2
+    assert move_stats["failed_files"] == 0
+    assert target.read_text() == "main_data1"
+
+
+@patch('shutil.move')
+@patch('blackbird.operations.delete_operation_state')
+def test_move_specific_folders_matches_whole_segments(mock_delete_state, mock_shutil_move, setup_test_environment):
+    """Folder filters match whole path segments, not arbitrary string prefixes."""
+    dataset, *_ = setup_test_environment
+    move_stats = move_data(
+        dataset=dataset,
+        source_location_name=LOC_MAIN,
+        target_location_name=LOC_HDD,
+        specific_folders=["Artist1/Album", "/Artist1/AlbumA/track1_vocals.flac/"],
+    )
+
+    assert move_stats["moved_files"] == 1
+    moved_source = mock_shutil_move.call_args[0][0]
+    assert moved_source.endswith("track1_vocals.flac")
+    operations.get_state_log_path(move_stats["state_file_path"]).unlink()
+    move_stats["state_file_path"].unlink()
+
+
+@pytest.mark.parametrize("use_kernel_copy", [True, False])
+def test_fast_copy(tmp_path, monkeypatch, use_kernel_copy):
+    """Copies across filesystems keep data and timestamps, with or without kernel support."""
+    src = tmp_path / "src.flac"
+    dst = tmp_path / "dst.flac"
+    src.write_bytes(os.urandom(300_000))
+    os.utime(src, (1_000_000, 1_000_000))
+    if not use_kernel_copy:
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        monkeypatch.setattr(mover, "FICLONE", None)
+        monkeypatch.setattr(mover.os, "copy_file_range", unsupported, raising=False)
+
+    assert _fast_copy(str(src), str(dst)) == str(dst)
+    assert dst.read_bytes() == src.read_bytes()
+    assert dst.stat().st_mtime == 1_000_000
+
+
+@patch('shutil.move')
+@patch('blackbird.operations.delete_operation_state')
+def test_move_creates_each_target_dir_once(mock_delete_state, mock_shutil_move, setup_test_environment):
+    """Files sharing an album directory trigger a single mkdir."""
+    dataset, _, _, hdd_path = setup_test_environment
+    with patch('blackbird.mover.os.makedirs', wraps=os.makedirs) as mock_makedirs:
+        move_stats = move_data(
+            dataset=dataset,
+            source_location_name=LOC_MAIN,
+            target_location_name=LOC_HDD,
+            specific_folders=["Artist1/AlbumA"],
+        )
+
+    assert move_stats["moved_files"] == 2
+    target_dir_calls = [c for c in mock_makedirs.call_args_list if c.args[0] == str(hdd_path / "Artist1" / "AlbumA")]
+    assert len(target_dir_calls) == 1
+    operations.get_state_log_path(move_stats["state_file_path"]).unlink()
+    move_stats["state_file_path"].unlink()
+
+
+def test_move_resolves_paths_without_dataset_lookup(setup_test_environment):
+    """The move loop resolves paths with a resolver built once per move."""
+    dataset, main_path, _, hdd_path = setup_test_environment
+    with patch.object(Dataset, 'resolve_path') as mock_resolve:
+        move_stats = move_data(
+            dataset=dataset,
+            source_location_name=LOC_MAIN,
+            target_location_name=LOC_HDD,
+            specific_folders=["Artist1/AlbumA"],
+        )
+
+    mock_resolve.assert_not_called()
+    assert move_stats["moved_files"] == 2
+    assert (hdd_path / "Artist1" / "AlbumA" / "track1_vocals.flac").read_text() == "main_data1"
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_operation_state_roundtrip_json_backends(tmp_path, monkeypatch, orjson_available):
+    """State files round-trip with and without orjson and stay readable by the other backend."""
+    if orjson_available and not operations.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(operations, "ORJSON_AVAILABLE", orjson_available)
+    hashes = [hash("Main/A/B/t_vocals.mp3"), -42, 7]
+    state_file = create_operation_state(tmp_path, "move", LOC_MAIN, LOC_SSD, hashes)
+    operations.update_operation_state_bulk(state_file, {-42: "failed: naïve error"})
+
+    with open(state_file) as f:
+        raw = json.load(f)
+    assert raw["hashes"] == hashes
+    assert raw["statuses"] == ["pending", "failed: naïve error", "pending"]
+    assert load_operation_state(state_file)["files"] == {hashes[0]: "pending", -42: "failed: naïve error", 7: "pending"}
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+@pytest.mark.parametrize("content", [b"", b"{\"operation_type\": ", b"[]"])
+def test_load_operation_state_rejects_bad_files(tmp_path, monkeypatch, orjson_available, content):
+    """Empty, truncated or malformed state files are reported as not resumable."""
+    if orjson_available and not operations.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(operations, "ORJSON_AVAILABLE", orjson_available)
+    state_file = tmp_path / "operation_move_1.json"
+    state_file.write_bytes(content)
+    assert load_operation_state(state_file) is None
+
+
+def test_load_operation_state_reads_files_object(tmp_path):
+    """State files that store the files map as an object keyed by hash still load."""
+    state_file = tmp_path / "operation_move_1.json"
+    state_file.write_text(json.dumps({
+        "operation_type": "move", "timestamp": 1.0, "source": LOC_MAIN,
+        "target_location": LOC_SSD, "components": None,
+        "files": {"5": "done", "-3": "pending"},
+    }))
+    assert load_operation_state(state_file)["files"] == {5: "done", -3: "pending"}
+
+
+@patch('shutil.move')
+@patch('blackbird.operations.delete_operation_state')
+def test_size_limit_selects_directory_by_directory(mock_delete_state, mock_shutil_move, setup_test_environment):
+    """A directory's own files are selected together, before its subfolders."""
+    dataset, *_ = setup_test_environment
+    # As plain strings 'AlbumA/CD1/...' sorts between 'AlbumA/A.flac' and 'AlbumA/track1_*'
+    for rel in ["Artist1/AlbumA/A.flac", "Artist1/AlbumA/CD1/x.flac"]:
+        symbolic = f"{LOC_MAIN}/{rel}"
+        dataset.index.file_info_by_hash[hash(symbolic)] = (symbolic, 10)
+
+    move_stats = move_data(
+        dataset=dataset,
+        source_location_name=LOC_MAIN,
+        target_location_name=LOC_SSD,
+        size_limit_gb=30 / 1024**3,
+    )
+
+    assert move_stats["moved_files"] == 3
+    moved = {Path(c.args[0]).name for c in mock_shutil_move.call_args_list}
+    assert moved == {"A.flac", "track1_drums.flac", "track1_vocals.flac"}
+    operations.get_state_log_path(move_stats["state_file_path"]).unlink()
+    move_stats["state_file_path"].unlink()
+
+
+def test_move_missing_source_with_mismatched_target_fails(setup_test_environment):
+    """A missing source only counts as moved if the target has the indexed size."""
+    dataset, main_path, _, hdd_path = setup_test_environment
+    source = main_path / "Artist1" / "AlbumA" / "track1_vocals.flac"
+    target = hdd_path / "Artist1" / "AlbumA" / "track1_vocals.flac"
+    target.parent.mkdir(parents=True)
+    target.write_text("partial")
+    source.unlink()
+
+    move_stats = move_data(
+        dataset=dataset,
+        source_location_name=LOC_MAIN,
+        target_location_name=LOC_HDD,
+        specific_folders=["Artist1/AlbumA/track1_vocals.flac"],
+    )
+
+    assert move_stats["moved_files"] == 0
+    assert move_stats["failed_files"] == 1
+    move_stats["state_file_path"].unlink()
+
+
+def test_move_many_files_same_filesystem(setup_test_environment):
+    """A large same-filesystem move moves every file, including one an interrupted run already moved."""
+    dataset, main_path, _, hdd_path = setup_test_environment
+    album = main_path / "Artist9" / "AlbumZ"
+    album.mkdir(parents=True)
+    count = 74
+    for n in range(count):
+        (album / f"track{n}.flac").write_text(f"data{n}")
+        symbolic = f"{LOC_MAIN}/Artist9/AlbumZ/track{n}.flac"
+        dataset.index.file_info_by_hash[hash(symbolic)] = (symbolic, len(f"data{n}"))
+    # One file was already moved by an interrupted run
+    (hdd_path / "Artist9" / "AlbumZ").mkdir(parents=True)
+    shutil.move(str(album / "track0.flac"), str(hdd_path / "Artist9" / "AlbumZ" / "track0.flac"))
+
+    move_stats = move_data(
+        dataset=dataset,
+        source_location_name=LOC_MAIN,
+        target_location_name=LOC_HDD,
+        specific_folders=["Artist9"],
+    )
+
+    assert move_stats["moved_files"] == count
+    assert move_stats["failed_files"] == 0
+    assert not any(album.iterdir())
+    for n in range(count):
+        assert (hdd_path / "Artist9" / "AlbumZ" / f"track{n}.flac").read_text() == f"data{n}"
+
+
+@patch('shutil.move')
+def test_move_path_resolution_failure_is_recorded_upfront(mock_shutil_move, setup_test_environment):
+    """A file whose path can't be resolved is marked failed without stopping the others."""
+    dataset, *_ = setup_test_environment
+    real_make_resolver = mover.make_resolver
+    bad_path = f"{LOC_MAIN}/Artist1/AlbumA/track1_vocals.flac"
+
+    def make_failing_resolver(locations):
+        resolve = real_make_resolver(locations)
+        def resolver(symbolic_path):
+            if symbolic_path == bad_path:
+                raise SymbolicPathError("unresolvable")
+            # Every path is resolved before the first move starts
+            mock_shutil_move.assert_not_called()
+            return resolve(symbolic_path)
+        return resolver
+
+    with patch.object(mover, 'make_resolver', make_failing_resolver):
+        move_stats = move_data(
+            dataset=dataset,
+            source_location_name=LOC_MAIN,
+            target_location_name=LOC_HDD,
+            specific_folders=["Artist1/AlbumA"],
+        )
+
+    assert move_stats["moved_files"] == 1
+    assert move_stats["failed_files"] == 1
+    state = load_operation_state(move_stats["state_file_path"])
+    assert state["files"][hash(bad_path)].startswith("failed: Path resolution error")
+    move_stats["state_file_path"].unlink()
@@ -1,6 +1,7 @@
 import pytest
 import json
 import time
+import os
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from unittest.mock import patch, MagicMock, call
@@ -157,6 +158,25 @@ def test_state_file_creation_and_deletion(temp_dataset: Path):
     assert find_latest_state_file(bb_dir, op_type) is None
 
 
+def test_find_latest_state_file(tmp_path: Path):
+    """The newest state file of the requested type wins; other files and types are ignored."""
+    assert find_latest_state_file(tmp_path / "missing", "sync") is None
+
+    for name, mtime in [
+        ("operation_sync_100.json", 100),
+        ("operation_sync_300.json", 300),
+        ("operation_sync_200.json", 200),
+        ("operation_move_900.json", 900),
+        ("operation_sync_999.log", 999),
+    ]:
+        path = tmp_path / name
+        path.write_text("{}")
+        os.utime(path, (mtime, mtime))
+
+    assert find_latest_state_file(tmp_path, "sync") == tmp_path / "operation_sync_300.json"
+    assert find_latest_state_file(tmp_path, "move") == tmp_path / "operation_move_900.json"
+
+
 @patch('blackbird.sync.configure_client') # Mock the client configuration
 @patch('blackbird.sync.DatasetSync._download_file') # Mock the actual download method
 def test_resume_success(
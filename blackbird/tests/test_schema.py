@@ -27,6 +27,23 @@ def test_schema_creation(test_dataset):
     assert isinstance(data["components"], dict)
 
 
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_schema_save_load_roundtrip(test_dataset, monkeypatch, use_orjson):
+    """Schemas round-trip through both JSON backends, keeping non-ASCII text readable."""
+    import blackbird.schema as schema_module
+    if use_orjson and not schema_module.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(schema_module, "ORJSON_AVAILABLE", use_orjson)
+
+    schema = DatasetComponentSchema.create(test_dataset)
+    schema.schema["components"]["вокал"] = {"pattern": "*_вокал.mp3", "multiple": False}
+    schema.save()
+
+    assert "вокал" in schema.schema_path.read_text(encoding="utf-8")
+    loaded = DatasetComponentSchema.load(schema.schema_path)
+    assert loaded.schema == schema.schema
+
+
 def test_add_component(test_dataset):
     """Test adding a new component."""
     schema = DatasetComponentSchema.create(test_dataset)
@@ -78,6 +95,88 @@ def test_validate_structure(test_dataset):
     assert result.is_valid
 
 
+def test_validate_skips_blackbird_dir(test_dataset):
+    """Directories under .blackbird are not walked or counted as dataset structure."""
+    schema = DatasetComponentSchema.create(test_dataset)
+    (test_dataset / "Artist1" / "Album1").mkdir(parents=True)
+    (test_dataset / "Artist1" / "Album1" / "track1_instrumental.mp3").touch()
+    cache_dir = test_dataset / ".blackbird" / "cache" / "a" / "b" / "c"
+    cache_dir.mkdir(parents=True)
+    (cache_dir / "stale_instrumental.mp3").touch()
+
+    result = schema.validate()
+    assert result.is_valid
+    assert result.stats["directory_structure"] == {"artists": 1, "albums": 1, "cds": 0, "tracks": 1}
+
+    data_result = schema.validate_against_data()
+    assert data_result.stats["total_files"] == 1
+
+
+def test_validate_against_data_matches_components(test_dataset):
+    """Files are matched to the first component whose pattern fits; others are reported."""
+    schema = DatasetComponentSchema.create(test_dataset)
+    schema.schema["components"] = {
+        "instrumental": {"pattern": "*_instrumental.mp3", "multiple": False},
+        "sections": {"pattern": "*_section[0-9].mp3", "multiple": True},
+    }
+    album = test_dataset / "Artist1" / "Album1"
+    album.mkdir(parents=True)
+    for name in ["t1_instrumental.mp3", "t1_section1.mp3", "t1_section2.mp3", "t1_sectionX.mp3", "t1_notes.txt"]:
+        (album / name).touch()
+
+    result = schema.validate_against_data()
+    assert result.is_valid
+    assert result.stats["matched_files"] == 3
+    assert result.stats["unmatched_files"] == 2
+    assert result.stats["component_coverage"]["sections"]["matched"] == 2
+
+
+def test_validate_against_data_multiple_files_constraint(test_dataset):
+    """Only single-file components with several files for one track are reported."""
+    schema = DatasetComponentSchema.create(test_dataset)
+    schema.schema["components"] = {
+        "instrumental": {"pattern": "*_instrumental*.mp3", "multiple": False},
+        "sections": {"pattern": "*_section[0-9].mp3", "multiple": True},
+    }
+    album = test_dataset / "Artist1" / "Album1"
+    album.mkdir(parents=True)
+    for name in ["t1_instrumental.mp3", "t1_instrumental2.mp3", "t1_section1.mp3", "t1_section2.mp3", "t2_instrumental.mp3"]:
+        (album / name).touch()
+
+    result = schema.validate_against_data()
+    assert not result.is_valid
+    assert len(result.errors) == 1
+    assert "'instrumental'" in result.errors[0] and "track 't1'" in result.errors[0]
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("t1_instrumental.mp3", 0),
+    ("t1_section1.mp3", 1),
+    ("t1_vocals.mp3", 2),
+    ("t1_sectionX.mp3", 2),
+    ("t1.mir.json", None),
+    ("", None),
+])
+def test_component_classifier_first_match_wins(name, expected):
+    """The combined regex picks the first pattern in schema order, like fnmatch."""
+    from blackbird.schema import _component_classifier
+    classify = _component_classifier(("*_instrumental.mp3", "*_section[0-9].mp3", "*.mp3"))
+    assert classify(name) == expected
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("a_section_1.mp3", 0),
+    ("a_instrumental.mp3", 1),
+    ("a_vocals.mp3", 2),
+    ("a_other.mp3", None),
+])
+def test_component_classifier_multi_star_pattern_first(name, expected):
+    """Groups that fnmatch.translate adds for multi-* patterns don't shift later alternatives."""
+    from blackbird.schema import _component_classifier
+    classify = _component_classifier(("*_section*.mp3", "*_instrumental.mp3", "*_vocals.mp3"))
+    assert classify(name) == expected
+
+
 def test_cd_structure(test_dataset):
     """Test CD directory structure validation."""
     schema = DatasetComponentSchema.create(test_dataset)
@@ -166,6 +265,89 @@ def _create_album_files(album_dir, track_bases, components):
             (album_dir / f"{base}{suffix}").touch()
 
 
+def test_discover_schema_multiple_folders(tmp_path):
+    """Discovery over several folders merges the per-folder results and skips missing ones."""
+    dataset_path = tmp_path / "dataset"
+    components = ["_instrumental.mp3", "_vocals_noreverb.mp3", ".mir.json"]
+    _create_album_files(dataset_path / "Artist1" / "Album1", ["01.Artist1 - One", "02.Artist1 - Two"], components)
+    _create_album_files(dataset_path / "Artist2" / "Album1", ["01.Artist2 - One"], components)
+    _create_album_files(dataset_path / "Artist3" / "Album1", ["01.Artist3 - One"], components)
+
+    schema = DatasetComponentSchema(dataset_path)
+    result = schema.discover_schema(folders=["Artist1", "Artist2", "Missing"])
+
+    assert result.is_valid
+    assert set(schema.schema["components"]) == {"instrumental.mp3", "vocals_noreverb.mp3", "mir.json"}
+    assert result.stats["components"]["instrumental.mp3"]["file_count"] == 3
+    assert result.stats["total_files"] == 9
+
+
+def test_analyze_parallel_matches_serial(tmp_path):
+    """Walking top-level directories concurrently gives the same analysis as a single walk."""
+    components = ["_instrumental.mp3", "_vocals_stretched_120bpm_section1.mp3", ".mir.json"]
+    _create_album_files(tmp_path / "Artist1" / "Album1", ["01.Track", "02.Track"], components)
+    _create_album_files(tmp_path / "Artist2" / "Album1" / "CD1", ["01.Track"], components)
+    _create_album_files(tmp_path / "Artist3" / "Album1", ["01.Other"], ["_instrumental.mp3", "_cover.jpg"])
+    (tmp_path / "readme.txt").touch()
+    (tmp_path / "_notes.txt").touch()
+
+    schema = DatasetComponentSchema(tmp_path)
+    serial = schema._analyze_file_patterns_in_directory(str(tmp_path))
+    parallel = schema._analyze_file_patterns_in_directory(str(tmp_path), parallel=True)
+    assert parallel == serial
+    assert "_notes.txt" in parallel[2]
+
+
+def test_list_tracks(tmp_path):
+    """Tracks are listed from instrumental files as paths relative to the dataset, skipping .blackbird."""
+    _create_album_files(tmp_path / "Artist1" / "Album1", ["01.Track", "02.Track"], ["_instrumental.mp3", ".mir.json"])
+    _create_album_files(tmp_path / "Artist1" / "Album2" / "CD1", ["01.Track"], ["_instrumental.mp3"])
+    _create_album_files(tmp_path / "Artist2" / "Album1", ["01.Track"], ["_instrumental.mp3"])
+    _create_album_files(tmp_path / ".blackbird", ["cached"], ["_instrumental.mp3"])
+    (tmp_path / "Loose_instrumental.mp3").touch()
+
+    schema = DatasetComponentSchema(tmp_path)
+    assert schema._list_tracks(str(tmp_path)) == [
+        "Artist1/Album1/01.Track",
+        "Artist1/Album1/02.Track",
+        "Artist1/Album2/CD1/01.Track",
+        "Artist2/Album1/01.Track",
+        "Loose",
+    ]
+
+
+def test_walk_files_does_not_follow_symlinked_dirs(tmp_path):
+    """The scandir walk yields regular files and file symlinks but never descends into linked directories."""
+    from blackbird.schema import _walk_files
+    _create_album_files(tmp_path / "Artist1" / "Album1", ["01.Track"], ["_instrumental.mp3"])
+    (tmp_path / "Linked").symlink_to(tmp_path / "Artist1", target_is_directory=True)
+    (tmp_path / "link_instrumental.mp3").symlink_to(tmp_path / "Artist1" / "Album1" / "01.Track_instrumental.mp3")
+
+    names = sorted(entry.path[len(str(tmp_path)) + 1:] for entry in _walk_files(str(tmp_path)))
+    assert names == ["Artist1/Album1/01.Track_instrumental.mp3", "link_instrumental.mp3"]
+
+
+def test_parse_real_folder_report(tmp_path, capsys):
+    """The folder report groups files by component and skips .blackbird."""
+    dataset_path = tmp_path / "dataset"
+    _create_album_files(dataset_path / "Artist1" / "Album1", ["01.Track"], ["_instrumental.mp3", ".mir.json", "_cover.jpg"])
+    (dataset_path / ".blackbird").mkdir()
+    (dataset_path / ".blackbird" / "x_instrumental.mp3").touch()
+
+    schema = DatasetComponentSchema(dataset_path)
+    schema.schema["components"] = {
+        "instrumental": {"pattern": "*_instrumental.mp3", "multiple": False},
+        "mir": {"pattern": "*.mir.json", "multiple": False},
+    }
+    schema.parse_real_folder_and_report(dataset_path)
+
+    out = capsys.readouterr().out
+    assert "Total files: 3" in out
+    assert "Matched to components: 2" in out
+    assert "Artist1/Album1/01.Track_cover.jpg" in out
+    assert "x_instrumental.mp3" not in out
+
+
 def test_discover_schema_real_album(tmp_path):
     """Test schema discovery with a realistic album structure."""
     dataset_path = tmp_path / "dataset"
@@ -2,6 +2,7 @@
 
 import pytest
 import json
+import os
 from pathlib import Path
 from blackbird.schema import DatasetComponentSchema
 
@@ -127,6 +128,14 @@ class TestGetTrackRelativePath:
         # Both should resolve to the same track base
         assert instrumental == vocals
 
+    def test_follows_schema_changes(self, dataset_with_tracks):
+        """Components added after a lookup are taken into account by later lookups."""
+        schema = DatasetComponentSchema(dataset_with_tracks)
+        track_file = dataset_with_tracks / "Artist1" / "Album1 [2020]" / "01.Artist1 - Track One_drums.mp3"
+        assert schema.get_track_relative_path(track_file).endswith("_drums")
+        schema.schema["components"]["drums"] = {"pattern": "*_drums.mp3", "multiple": False}
+        assert schema.get_track_relative_path(track_file).endswith("01.Artist1 - Track One")
+
     def test_cd_track_path(self, cd_dataset):
         """Tracks in CD directories include the CD in the relative path."""
         schema = DatasetComponentSchema(cd_dataset)
@@ -164,6 +173,58 @@ class TestFindCompanionFiles:
         assert len(companions) == 0
 
 
+    def test_lists_directory_once_and_sees_new_files(self, dataset_with_tracks, monkeypatch):
+        """Tracks in one album share a directory listing, refreshed when the directory changes."""
+        import blackbird.schema as schema_module
+        schema = DatasetComponentSchema(dataset_with_tracks)
+        album = dataset_with_tracks / "Artist1" / "Album1 [2020]"
+        # Listings are only cached once the directory is older than the racy window
+        st = os.stat(album)
+        os.utime(album, ns=(st.st_atime_ns, st.st_mtime_ns - 10_000_000_000))
+        scans = []
+        real_scandir = schema_module.os.scandir
+        monkeypatch.setattr(schema_module.os, "scandir", lambda p: scans.append(p) or real_scandir(p))
+
+        assert len(schema.find_companion_files(album / "01.Artist1 - Track One_instrumental.mp3")) == 2
+        assert schema.find_companion_files(album / "02.Artist1 - Track Two_instrumental.mp3") == []
+        assert len(scans) == 1
+
+        (album / "02.Artist1 - Track Two.mir.json").write_bytes(b"{}")
+        st = os.stat(album)
+        os.utime(album, ns=(st.st_atime_ns, st.st_mtime_ns - 9_000_000_000))
+        companions = schema.find_companion_files(album / "02.Artist1 - Track Two_instrumental.mp3")
+        assert companions == [album / "02.Artist1 - Track Two.mir.json"]
+        assert len(scans) == 2
+
+    def test_recently_modified_directory_is_listed_again(self, dataset_with_tracks):
+        """A file created in the same mtime tick as a cached listing is still found."""
+        schema = DatasetComponentSchema(dataset_with_tracks)
+        album = dataset_with_tracks / "Artist1" / "Album1 [2020]"
+        mtime_ns = os.stat(album).st_mtime_ns
+        assert schema.find_companion_files(album / "02.Artist1 - Track Two_instrumental.mp3") == []
+
+        # Simulate a coarse timestamp: the new file leaves the directory mtime unchanged
+        (album / "02.Artist1 - Track Two.mir.json").write_bytes(b"{}")
+        os.utime(album, ns=(mtime_ns, mtime_ns))
+        companions = schema.find_companion_files(album / "02.Artist1 - Track Two_instrumental.mp3")
+        assert companions == [album / "02.Artist1 - Track Two.mir.json"]
+
+    def test_directory_cache_is_bounded_and_clearable(self, dataset_with_tracks, monkeypatch):
+        """Only the most recently used listings are kept, and they can be dropped explicitly."""
+        import blackbird.schema as schema_module
+        monkeypatch.setattr(schema_module, "DIR_NAMES_CACHE_SIZE", 2)
+        monkeypatch.setattr(schema_module, "DIR_NAMES_RACY_WINDOW_NS", 0)
+        schema = DatasetComponentSchema(dataset_with_tracks)
+        directories = [dataset_with_tracks / name for name in ("a", "b", "c")]
+        for directory in directories:
+            directory.mkdir()
+            schema._directory_names(directory)
+        assert list(schema._dir_names_cache) == [str(d) for d in directories[1:]]
+
+        schema.clear_directory_cache()
+        assert not schema._dir_names_cache
+
+
 class TestCDStructure:
     """Tests for multi-CD album handling."""
 
@@ -1,4 +1,6 @@
 import math
+import os
+from pathlib import Path
 
 def format_size(size_bytes: int) -> str:
     """Formats a size in bytes into a human-readable string (KB, MB, GB, etc.)."""
@@ -9,3 +11,28 @@ def format_size(size_bytes: int) -> str:
     p = math.pow(1024, i)
     s = round(size_bytes / p, 2)
     return f"{s} {size_name[i]}"
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Replaces the contents of ``path`` with ``data`` without a partial-write window.
+
+    The data goes to a temporary file next to ``path`` in as few ``write``
+    calls as the kernel allows, is fsynced, and then renamed over ``path``,
+    so readers see either the old or the new contents.
+    """
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -37,5 +37,9 @@ setup(
             'black>=20.8b1',
             'mypy>=0.800',
         ],
+        'fast': [
+            'msgspec>=0.18.0',
+            'orjson>=3.0.0',
+        ],
     },
 ) 
\ No newline at end of file